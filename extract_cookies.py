@@ -3,6 +3,7 @@ Extract Gemini cookies from browser automatically
 """
 import sys
 import os
+from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -19,6 +20,10 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Env keys this script owns in .env; old lines starting with these are
+# dropped before the fresh values are appended
+_MANAGED_ENV_KEYS = ('GEMINI_COOKIE_1PSID', 'USE_G4F', 'COOKIE_AUTO_REFRESH')
+
 def main():
     print("\n" + "="*70)
     print("  GEMINI COOKIE EXTRACTOR")
@@ -75,27 +80,32 @@ def main():
             response = input("\nSave to .env automatically? (y/n): ").strip().lower()
             
             if response == 'y':
-                # Read existing .env
+                # Read existing .env in one shot
+                env_path = Path(env_file)
                 env_lines = []
-                if os.path.exists(env_file):
-                    with open(env_file, 'r') as f:
-                        env_lines = f.readlines()
-                
-                # Remove old cookie lines
-                env_lines = [line for line in env_lines if not any(
-                    key in line for key in ['GEMINI_COOKIE_1PSID', 'GEMINI_COOKIE_1PSIDTS', 'USE_G4F', 'COOKIE_AUTO_REFRESH']
-                )]
+                if env_path.exists():
+                    env_lines = env_path.read_text().splitlines(keepends=True)
                 
-                # Add new cookie lines
-                env_lines.append('\n# Gemini Cookie Authentication\n')
-                env_lines.append(f'GEMINI_COOKIE_1PSID={secure_1psid}\n')
-                env_lines.append(f'GEMINI_COOKIE_1PSIDTS={secure_1psidts}\n')
-                env_lines.append('USE_G4F=false\n')
-                env_lines.append('COOKIE_AUTO_REFRESH=true\n')
+                # Remove old cookie lines - startswith with a tuple is a
+                # single C-level multi-prefix check per line (1PSIDTS is
+                # already covered by the 1PSID prefix)
+                env_lines = [
+                    line for line in env_lines
+                    if not line.lstrip().startswith(_MANAGED_ENV_KEYS)
+                ]
                 
-                # Write back
-                with open(env_file, 'w') as f:
-                    f.writelines(env_lines)
+                # Append the new cookie block and emit everything as one
+                # joined payload in a single write
+                payload = ''.join(env_lines) + '\n'.join([
+                    '',
+                    '# Gemini Cookie Authentication',
+                    f'GEMINI_COOKIE_1PSID={secure_1psid}',
+                    f'GEMINI_COOKIE_1PSIDTS={secure_1psidts}',
+                    'USE_G4F=false',
+                    'COOKIE_AUTO_REFRESH=true',
+                    '',
+                ])
+                env_path.write_text(payload)
                 
                 print(f"\n✅ Cookies saved to {env_file}")
                 print(f"\nNext steps:")
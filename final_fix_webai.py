@@ -2,29 +2,39 @@
 Final fix for run.py - Force webai mode in the controller loop
 """
 
-# Read run.py
-with open('src/run.py', 'r', encoding='utf-8') as f:
-    content = f.read()
+from pathlib import Path
 
-# Find the line where current_mode is set from requested or initial_mode
-# and force it to always be "webai"
-import re
+_RUN_PATH = Path('src/run.py')
 
-# Pattern: current_mode = requested or initial_mode
-pattern = r'(current_mode = requested or initial_mode)'
-replacement = r'current_mode = "webai"  # FORCED WEBAI MODE - Always use cookies\n                # \1'
+# Both targets are literal strings - plain str.replace is all we need,
+# no regex engine involved.
 
-content_modified = re.sub(pattern, replacement, content)
+# Target: current_mode = requested or initial_mode
+_MODE_OLD = 'current_mode = requested or initial_mode'
+_MODE_NEW = (
+    'current_mode = "webai"  # FORCED WEBAI MODE - Always use cookies\n'
+    '                # ' + _MODE_OLD
+)
 
-# Also force shared_state to webai at the start
-pattern2 = r'(shared_state = manager\.dict\(\{"requested_mode": None\}\))'
-replacement2 = r'\1\n    shared_state["requested_mode"] = "webai"  # Force WebAI from start'
+# Target: shared_state initialization
+_SHARED_STATE_OLD = 'shared_state = manager.dict({"requested_mode": None})'
+_SHARED_STATE_NEW = (
+    _SHARED_STATE_OLD + '\n'
+    '    shared_state["requested_mode"] = "webai"  # Force WebAI from start'
+)
+
+# Read run.py in one shot
+content = _RUN_PATH.read_text(encoding='utf-8')
 
-content_modified = re.sub(pattern2, replacement2, content_modified)
+# Find the line where current_mode is set from requested or initial_mode
+# and force it to always be "webai"
+content_modified = content.replace(_MODE_OLD, _MODE_NEW, 1)
+
+# Also force shared_state to webai at the start
+content_modified = content_modified.replace(_SHARED_STATE_OLD, _SHARED_STATE_NEW, 1)
 
 # Write back
-with open('src/run.py', 'w', encoding='utf-8') as f:
-    f.write(content_modified)
+_RUN_PATH.write_text(content_modified, encoding='utf-8')
 
 print("✅ run.py modified - WebAI mode forced in controller loop")
 print("Restart server - it will start directly in WebAI mode and work!")
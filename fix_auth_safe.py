@@ -2,23 +2,42 @@
 Simple and safe auth bypass - add return at start of dispatch function
 """
 
-# Read auth.py
-with open('src/app/middleware/auth.py', 'r', encoding='utf-8') as f:
-    content = f.read()
+import mmap
+from pathlib import Path
 
-# Find the dispatch function and add return at the very beginning
-# This will bypass all auth logic safely
-import re
+_AUTH_PATH = Path('src/app/middleware/auth.py')
 
-# Pattern to find the dispatch function
-pattern = r'(async def dispatch\(self, request: Request, call_next\):.*?\n)(        )'
-replacement = r'\1        # AUTH COMPLETELY DISABLED - Return immediately\n        return await call_next(request)\n\n\2'
+# The dispatch signature is a fixed literal, so a find + slice splice
+# is enough - no regex engine needed.
+_DISPATCH_SIGNATURE = b'async def dispatch(self, request: Request, call_next):'
+_BYPASS_BLOCK = (
+    b'        # AUTH COMPLETELY DISABLED - Return immediately\n'
+    b'        return await call_next(request)\n'
+    b'\n'
+)
 
-content_modified = re.sub(pattern, replacement, content, count=1, flags=re.DOTALL)
+# Memory-map auth.py so the signature search runs over the page cache
+# without copying the file into the Python heap first.
+with open(_AUTH_PATH, 'r+b') as f:
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        idx = mm.find(_DISPATCH_SIGNATURE)
+        if idx == -1:
+            content_modified = None
+        else:
+            # Insert right after the end of the signature line
+            insert_at = mm.find(b'\n', idx) + 1
+            content_modified = mm[:insert_at] + _BYPASS_BLOCK + mm[insert_at:]
+    finally:
+        mm.close()
 
-# Write back
-with open('src/app/middleware/auth.py', 'w', encoding='utf-8') as f:
-    f.write(content_modified)
+if content_modified is None:
+    print("❌ dispatch function not found in auth.py - nothing modified")
+else:
+    # Write back in one shot
+    _AUTH_PATH.write_bytes(content_modified)
 
-print("✅ auth.py safely modified - all requests will bypass authentication")
-print("Restart server and test")
+    print("✅ auth.py safely modified - all requests will bypass authentication")
+    print("Restart server and test")
@@ -2,28 +2,32 @@
 Force WebAI mode in run.py - bypass input listener completely
 """
 
-# Read run.py
-with open('src/run.py', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from pathlib import Path
 
-# Find the line with initial_mode and add forced mode right after
-modified_lines = []
-for i, line in enumerate(lines):
-    modified_lines.append(line)
-    
-    # After initial_mode is set, force it to webai
-    if 'initial_mode = "webai"' in line or 'initial_mode = "g4f"' in line:
-        # Add forced mode selection right after
-        modified_lines.append('\n')
-        modified_lines.append('    # === FORCE WEBAI MODE - BYPASS INPUT LISTENER ===\n')
-        modified_lines.append('    print("🚀 Cookies detected → Forcing WebAI mode (no input required)")\n')
-        modified_lines.append('    selected_mode = "webai"  # Force WebAI mode\n')
-        modified_lines.append('    # === END FORCE ===\n')
-        modified_lines.append('\n')
+# Block inserted right after the initial_mode assignment
+_FORCE_BLOCK = (
+    '\n'
+    '    # === FORCE WEBAI MODE - BYPASS INPUT LISTENER ===\n'
+    '    print("🚀 Cookies detected → Forcing WebAI mode (no input required)")\n'
+    '    selected_mode = "webai"  # Force WebAI mode\n'
+    '    # === END FORCE ===\n'
+    '\n'
+)
+
+_RUN_PATH = Path('src/run.py')
+
+# Read run.py in one shot
+content = _RUN_PATH.read_text(encoding='utf-8')
+
+# Insert the forced mode block right after initial_mode is set - a single
+# whole-file replace instead of a per-line append loop
+for anchor in ('initial_mode = "webai"\n', 'initial_mode = "g4f"\n'):
+    if anchor in content:
+        content = content.replace(anchor, anchor + _FORCE_BLOCK, 1)
+        break
 
 # Write back
-with open('src/run.py', 'w', encoding='utf-8') as f:
-    f.writelines(modified_lines)
+_RUN_PATH.write_text(content, encoding='utf-8')
 
 print("✅ run.py modified to force WebAI mode automatically")
 print("Restart server - it will start directly in WebAI mode")
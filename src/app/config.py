@@ -1,7 +1,10 @@
 # src/app/config.py
 import configparser
+import io
 import logging
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from pathlib import Path
 
@@ -14,6 +17,11 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Validation constants - hoisted so validate_config does O(1) membership
+# checks without rebuilding the collections per call
+_REQUIRED_SECTIONS = ("Browser", "AI", "Cookies", "Proxy", "EnabledAI")
+_VALID_BROWSERS = frozenset(("chrome", "firefox", "brave", "edge", "safari"))
+
 # Load environment variables from .env file if available
 if DOTENV_AVAILABLE:
     env_path = Path(__file__).parent.parent.parent / ".env"
@@ -22,28 +30,36 @@ if DOTENV_AVAILABLE:
         logger.info(f"Loaded environment variables from {env_path}")
 
 
+@lru_cache(maxsize=256)
 def get_env(key: str, default: Optional[str] = None) -> Optional[str]:
     """
     Get environment variable with fallback to default.
-    
+
+    Results are cached; call invalidate_env_cache() after mutating
+    os.environ (e.g. in tests or reload paths).
+
     Args:
         key: Environment variable name
         default: Default value if not found
-        
+
     Returns:
         Environment variable value or default
     """
     return os.getenv(key, default)
 
 
+@lru_cache(maxsize=256)
 def get_env_bool(key: str, default: bool = False) -> bool:
     """
     Get boolean environment variable.
-    
+
+    Results are cached; call invalidate_env_cache() after mutating
+    os.environ (e.g. in tests or reload paths).
+
     Args:
         key: Environment variable name
         default: Default value if not found
-        
+
     Returns:
         Boolean value
     """
@@ -51,14 +67,18 @@ def get_env_bool(key: str, default: bool = False) -> bool:
     return value in ('true', '1', 'yes', 'on')
 
 
+@lru_cache(maxsize=256)
 def get_env_int(key: str, default: int = 0) -> int:
     """
     Get integer environment variable.
-    
+
+    Results are cached; call invalidate_env_cache() after mutating
+    os.environ (e.g. in tests or reload paths).
+
     Args:
         key: Environment variable name
         default: Default value if not found
-        
+
     Returns:
         Integer value
     """
@@ -69,6 +89,18 @@ def get_env_int(key: str, default: int = 0) -> int:
         return default
 
 
+def invalidate_env_cache() -> None:
+    """
+    Clear the cached environment lookups.
+
+    Needed whenever os.environ is mutated after import (tests, hot
+    reload) so the getters pick up the new values.
+    """
+    get_env.cache_clear()
+    get_env_bool.cache_clear()
+    get_env_int.cache_clear()
+
+
 def load_config(config_file: str = "config.conf") -> configparser.ConfigParser:
     """
     Load configuration from config.conf file with environment variable overrides.
@@ -133,10 +165,15 @@ def load_config(config_file: str = "config.conf") -> configparser.ConfigParser:
     # EnabledAI settings
     config["EnabledAI"]["gemini"] = str(get_env_bool("GEMINI_ENABLED", True))
 
-    # Save updated configuration to file if it was modified
+    # Save updated configuration to file only if it actually changed -
+    # rendering to memory first avoids a disk write on every import
     try:
-        with open(config_file, "w", encoding="utf-8") as f:
-            config.write(f)
+        buffer = io.StringIO()
+        config.write(buffer)
+        new_content = buffer.getvalue()
+        config_path = Path(config_file)
+        if not config_path.exists() or config_path.read_text(encoding="utf-8") != new_content:
+            config_path.write_text(new_content, encoding="utf-8")
     except Exception as e:
         logger.warning(f"Could not write to config file: {e}")
 
@@ -153,19 +190,16 @@ def validate_config(config: configparser.ConfigParser) -> bool:
     Returns:
         True if configuration is valid, False otherwise
     """
-    required_sections = ["Browser", "AI", "Cookies", "Proxy", "EnabledAI"]
-    
-    for section in required_sections:
+    for section in _REQUIRED_SECTIONS:
         if section not in config:
             logger.error(f"Missing required configuration section: {section}")
             return False
-    
+
     # Validate browser name
-    valid_browsers = ["chrome", "firefox", "brave", "edge", "safari"]
     browser = config["Browser"].get("name", "").lower()
-    if browser not in valid_browsers:
+    if browser not in _VALID_BROWSERS:
         logger.warning(
-            f"Invalid browser '{browser}'. Valid options: {', '.join(valid_browsers)}"
+            f"Invalid browser '{browser}'. Valid options: {', '.join(sorted(_VALID_BROWSERS))}"
         )
     
     # Check if Gemini is enabled but cookies are missing
@@ -178,6 +212,31 @@ def validate_config(config: configparser.ConfigParser) -> bool:
     return True
 
 
+@dataclass(frozen=True, slots=True)
+class GeminiSettings:
+    """Immutable snapshot of the Gemini-related configuration."""
+    enabled: bool
+    cookie_1psid: Optional[str]
+    cookie_1psidts: Optional[str]
+    proxy: Optional[str]
+
+
+def build_gemini_settings(config: configparser.ConfigParser) -> GeminiSettings:
+    """
+    Snapshot the parser's Gemini fields into plain attributes.
+
+    Reading through configparser walks its Python-level section/option
+    chain every time; consumers on startup/reload paths get simple
+    attribute access instead.
+    """
+    return GeminiSettings(
+        enabled=config.getboolean("EnabledAI", "gemini", fallback=True),
+        cookie_1psid=config["Cookies"].get("gemini_cookie_1PSID"),
+        cookie_1psidts=config["Cookies"].get("gemini_cookie_1PSIDTS"),
+        proxy=config["Proxy"].get("http_proxy") or None,
+    )
+
+
 # Load configuration globally
 CONFIG = load_config()
 
@@ -185,6 +244,9 @@ CONFIG = load_config()
 if not validate_config(CONFIG):
     logger.warning("Configuration validation failed. Some features may not work correctly.")
 
+# Frozen snapshot of the Gemini settings for hot/startup paths
+CONFIG_GEMINI = build_gemini_settings(CONFIG)
+
 # Export environment-based settings for easy access
 ENVIRONMENT = get_env("ENVIRONMENT", "development")
 DEBUG_MODE = get_env_bool("DEBUG_MODE", ENVIRONMENT == "development")
@@ -192,3 +254,39 @@ LOG_LEVEL = get_env("LOG_LEVEL", "INFO" if not DEBUG_MODE else "DEBUG")
 LOG_FORMAT = get_env("LOG_FORMAT", "console")
 STREAMING_ENABLED = get_env_bool("STREAMING_ENABLED", True)
 METRICS_ENABLED = get_env_bool("METRICS_ENABLED", True)
+
+
+@dataclass(frozen=True, slots=True)
+class AppSettings:
+    """Immutable snapshot of the request-path environment flags."""
+    environment: str
+    is_production: bool
+    auth_enabled: bool
+    rate_limit_enabled: bool
+
+
+def build_app_settings() -> AppSettings:
+    """
+    Resolve the hot-path flags from the environment once.
+
+    Middleware reads plain attributes off the snapshot instead of
+    probing os.environ and lowercasing strings per request.
+    """
+    environment = get_env("ENVIRONMENT", "development")
+    return AppSettings(
+        environment=environment,
+        is_production=environment == "production",
+        auth_enabled=get_env_bool("API_AUTH_ENABLED", True),
+        rate_limit_enabled=get_env_bool("RATE_LIMIT_ENABLED", True),
+    )
+
+
+# Flag snapshot for middleware and startup gates
+settings = build_app_settings()
+
+
+def reset_settings() -> None:
+    """Rebuild the flag snapshot after mutating os.environ (tests/reload)."""
+    global settings
+    invalidate_env_cache()
+    settings = build_app_settings()
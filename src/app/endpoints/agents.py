@@ -6,10 +6,14 @@ This module provides endpoints optimized for AI agent frameworks like
 LangChain, CrewAI, and AutoGen, with support for multi-turn conversations,
 task chaining, and intelligent model routing.
 """
+import asyncio
+import json
 import logging
+import time
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.services.gemini_client import get_gemini_client
 from app.services.session_manager import get_translate_session_manager
@@ -20,8 +24,86 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# Per-token USD prices for the common gemini models (input, output),
+# folded from the per-1M-token table in app.utils.tokens so the hot path
+# is a single dict probe and two multiplies; unknown models fall back to
+# estimate_cost
+_GEMINI_TOKEN_PRICES = {
+    "gemini-1.5-flash": (0.075e-6, 0.30e-6),
+    "gemini-2.0-flash": (0.075e-6, 0.30e-6),
+    "gemini-2.5-pro": (1.25e-6, 5.00e-6),
+    "gemini-3.0-pro": (1.25e-6, 5.00e-6),
+}
+
+
+# The /v1/agents/models payload is static - serialize it once at import
+# so each request ships pre-built bytes with no dict construction or
+# JSON encoding work
+_AGENT_MODELS_JSON = json.dumps({
+    "task_routing": {
+        "creative": "gemini-2.5-pro",
+        "factual": "gemini-2.0-flash",
+        "reasoning": "gemini-2.5-pro",
+        "translation": "gemini-2.0-flash",
+        "summarization": "gemini-2.0-flash",
+        "research": "gemini-2.5-pro",
+        "code": "gemini-2.0-flash",
+        "vision": "gemini-2.5-pro"
+    },
+    "available_models": [
+        "gemini-2.0-flash",
+        "gemini-2.5-pro",
+        "gemini-1.5-flash",
+        "gpt-4",
+        "claude-3",
+        "grok-beta"
+    ],
+    "recommendations": {
+        "speed": "gemini-2.0-flash",
+        "quality": "gemini-2.5-pro",
+        "cost": "gemini-2.0-flash",
+        "reasoning": "gemini-2.5-pro"
+    }
+}).encode("utf-8")
+
+
+def _fast_cost_estimate(prompt_tokens: int, completion_tokens: int, model: str) -> Dict[str, float]:
+    """Inline cost estimate for known gemini models; defers otherwise."""
+    prices = _GEMINI_TOKEN_PRICES.get(model)
+    if prices is None:
+        return estimate_cost(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            model=model
+        )
+    input_cost = prompt_tokens * prices[0]
+    output_cost = completion_tokens * prices[1]
+    return {
+        "input_cost_usd": round(input_cost, 6),
+        "output_cost_usd": round(output_cost, 6),
+        "total_cost_usd": round(input_cost + output_cost, 6),
+        "model": model,
+        "note": "Estimated costs - actual pricing may vary"
+    }
+
+
+def gemini_dep():
+    """
+    FastAPI dependency resolving the initialized Gemini client.
+
+    Raises 503 once if the client is unavailable; FastAPI caches the
+    result per request.
+    """
+    client = get_gemini_client()
+    if not client:
+        raise HTTPException(status_code=503, detail="Gemini client is not initialized.")
+    return client
+
+
 class AgentTask(BaseModel):
     """Single task in an agent chain."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     task_id: str = Field(..., description="Unique identifier for this task")
     task_type: str = Field(..., description="Type of task: translate, summarize, research, etc.")
     input: str = Field(..., description="Input text for this task")
@@ -31,6 +113,8 @@ class AgentTask(BaseModel):
 
 class AgentChainRequest(BaseModel):
     """Request for chaining multiple agent tasks."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     chain_id: str = Field(..., description="Unique identifier for this chain")
     tasks: List[AgentTask] = Field(..., description="List of tasks to execute in sequence")
     pass_output: bool = Field(True, description="Pass output of each task as input to next")
@@ -40,37 +124,174 @@ class AgentChainRequest(BaseModel):
     )
 
 
-class AgentChainResponse(BaseModel):
-    """Response from agent chain execution."""
-    chain_id: str
-    results: List[Dict[str, Any]]
-    total_tokens: int
-    estimated_cost: Dict[str, float]
-    execution_time_ms: float
+async def _run_agent_chain(request: AgentChainRequest, gemini_client):
+    """
+    Execute the chain and yield one NDJSON frame per completed task,
+    followed by a summary frame.
+    """
+    start_time = time.perf_counter_ns()
+    total_tokens = 0
+    task_count = 0
+
+    # Bind hot lookups to locals once - LOAD_FAST in the loop body
+    # instead of repeated attribute/dict probes per task
+    generate = gemini_client.generate_content
+    routing = request.model_routing or {}
+    tasks = request.tasks
+
+    if not request.pass_output:
+        # Tasks are independent - fire all upstream calls concurrently
+        # and stream each frame as its task completes, so wall-clock time
+        # is max(latencies) instead of their sum
+        async def run_task(task: AgentTask, model: str):
+            try:
+                response = await generate(message=task.input, model=model, files=None)
+                return task, model, response, None
+            except Exception as e:
+                return task, model, None, e
+
+        futures = []
+        for task in tasks:
+            model = routing.get(task.task_type, task.model)
+            logger.info(f"Executing task {task.task_id} ({task.task_type}) with model {model}")
+            futures.append(asyncio.ensure_future(run_task(task, model)))
+
+        for future in asyncio.as_completed(futures):
+            task, model, response, error = await future
+            if error is not None:
+                logger.error(f"Error executing task {task.task_id}: {error}", exc_info=error)
+                yield _ndjson_frame({
+                    "task_id": task.task_id,
+                    "task_type": task.task_type,
+                    "model": model,
+                    "output": None,
+                    "error": str(error),
+                    "success": False
+                })
+                continue
+
+            task_tokens = count_messages_tokens(
+                [{"role": "user", "content": task.input}],
+                model
+            )
+            total_tokens += task_tokens
+            task_count += 1
+            yield _ndjson_frame({
+                "task_id": task.task_id,
+                "task_type": task.task_type,
+                "model": model,
+                "output": response.text,
+                "tokens": task_tokens,
+                "success": True
+            })
+    else:
+        # Chained tasks depend on each other's output and must run in order
+        previous_output = None
+
+        for task in tasks:
+            try:
+                # Determine model to use (routing logic)
+                model = routing.get(task.task_type, task.model)
+
+                # Prepare input (use previous output if chaining)
+                task_input = task.input
+                if previous_output:
+                    task_input = f"{task.input}\n\nContext from previous task:\n{previous_output}"
+
+                # Execute task
+                logger.info(f"Executing task {task.task_id} ({task.task_type}) with model {model}")
+
+                response = await generate(
+                    message=task_input,
+                    model=model,
+                    files=None
+                )
+
+                # Count tokens
+                task_tokens = count_messages_tokens(
+                    [{"role": "user", "content": task_input}],
+                    model
+                )
+                total_tokens += task_tokens
+                task_count += 1
+
+                yield _ndjson_frame({
+                    "task_id": task.task_id,
+                    "task_type": task.task_type,
+                    "model": model,
+                    "output": response.text,
+                    "tokens": task_tokens,
+                    "success": True
+                })
+
+                # Save output for next task
+                previous_output = response.text
+
+            except Exception as e:
+                logger.error(f"Error executing task {task.task_id}: {e}", exc_info=True)
+                yield _ndjson_frame({
+                    "task_id": task.task_id,
+                    "task_type": task.task_type,
+                    "model": task.model,
+                    "output": None,
+                    "error": str(e),
+                    "success": False
+                })
+                # Stop chain on error
+                break
+
+    # Calculate execution time - monotonic integer nanoseconds, immune
+    # to wall-clock adjustments
+    execution_time = (time.perf_counter_ns() - start_time) / 1_000_000
+
+    # Estimate costs
+    cost_estimate = _fast_cost_estimate(
+        prompt_tokens=total_tokens,
+        completion_tokens=total_tokens // 2,  # Rough estimate
+        model=request.tasks[0].model if request.tasks else "gemini-2.0-flash"
+    )
+
+    # Final summary frame
+    yield _ndjson_frame({
+        "chain_id": request.chain_id,
+        "completed_tasks": task_count,
+        "total_tokens": total_tokens,
+        "estimated_cost": cost_estimate,
+        "execution_time_ms": execution_time
+    })
+
 
+def _ndjson_frame(payload: Dict[str, Any]) -> bytes:
+    """Serialize one NDJSON frame."""
+    return (json.dumps(payload) + "\n").encode("utf-8")
 
-@router.post("/v1/agents/chain", response_model=AgentChainResponse)
-async def execute_agent_chain(request: AgentChainRequest):
+
+@router.post("/v1/agents/chain")
+async def execute_agent_chain(request: AgentChainRequest, gemini_client=Depends(gemini_dep)):
     """
-    Execute a chain of agent tasks sequentially.
-    
+    Execute a chain of agent tasks and stream results as NDJSON.
+
+    Each line of the response body is a JSON object for one completed
+    task (in completion order when tasks are independent), followed by a
+    final summary line with total tokens, estimated cost and timing.
+
     This endpoint is optimized for AI agent frameworks that need to:
     - Chain multiple LLM calls together
     - Pass outputs between tasks
     - Use different models for different task types
     - Track token usage and costs
-    
+
     Example:
     ```python
     # LangChain integration
     from langchain_openai import ChatOpenAI
-    
+
     llm = ChatOpenAI(
         base_url="http://localhost:6969/v1",
         api_key="your-api-key",
         model="gemini-2.0-flash"
     )
-    
+
     # Or use the chain endpoint directly
     response = requests.post(
         "http://localhost:6969/v1/agents/chain",
@@ -81,106 +302,24 @@ async def execute_agent_chain(request: AgentChainRequest):
                 {"task_id": "2", "task_type": "summarize", "input": ""}
             ],
             "pass_output": True
-        }
+        },
+        stream=True
     )
     ```
     """
-    import time
-    start_time = time.time()
-    
-    gemini_client = get_gemini_client()
-    if not gemini_client:
-        raise HTTPException(status_code=503, detail="Gemini client is not initialized.")
-    
-    results = []
-    total_tokens = 0
-    previous_output = None
-    
-    for task in request.tasks:
-        try:
-            # Determine model to use (routing logic)
-            model = task.model
-            if request.model_routing and task.task_type in request.model_routing:
-                model = request.model_routing[task.task_type]
-            
-            # Prepare input (use previous output if chaining)
-            task_input = task.input
-            if request.pass_output and previous_output:
-                task_input = f"{task.input}\n\nContext from previous task:\n{previous_output}"
-            
-            # Execute task
-            logger.info(f"Executing task {task.task_id} ({task.task_type}) with model {model}")
-            
-            response = await gemini_client.generate_content(
-                message=task_input,
-                model=model,
-                files=None
-            )
-            
-            # Count tokens
-            task_tokens = count_messages_tokens(
-                [{"role": "user", "content": task_input}],
-                model
-            )
-            total_tokens += task_tokens
-            
-            # Store result
-            result = {
-                "task_id": task.task_id,
-                "task_type": task.task_type,
-                "model": model,
-                "output": response.text,
-                "tokens": task_tokens,
-                "success": True
-            }
-            results.append(result)
-            
-            # Save output for next task
-            previous_output = response.text
-            
-        except Exception as e:
-            logger.error(f"Error executing task {task.task_id}: {e}", exc_info=True)
-            results.append({
-                "task_id": task.task_id,
-                "task_type": task.task_type,
-                "model": task.model,
-                "output": None,
-                "error": str(e),
-                "success": False
-            })
-            # Stop chain on error
-            break
-    
-    # Calculate execution time
-    execution_time = (time.time() - start_time) * 1000
-    
-    # Estimate costs
-    cost_estimate = estimate_cost(
-        prompt_tokens=total_tokens,
-        completion_tokens=total_tokens // 2,  # Rough estimate
-        model=request.tasks[0].model if request.tasks else "gemini-2.0-flash"
-    )
-    
-    return AgentChainResponse(
-        chain_id=request.chain_id,
-        results=results,
-        total_tokens=total_tokens,
-        estimated_cost=cost_estimate,
-        execution_time_ms=execution_time
+    return StreamingResponse(
+        _run_agent_chain(request, gemini_client),
+        media_type="application/x-ndjson"
     )
 
 
 @router.post("/v1/agents/task")
-async def execute_single_task(task: AgentTask):
+async def execute_single_task(task: AgentTask, gemini_client=Depends(gemini_dep)):
     """
     Execute a single agent task.
-    
+
     Simpler endpoint for single-step agent operations.
     """
-    gemini_client = get_gemini_client()
-    if not gemini_client:
-        raise HTTPException(status_code=503, detail="Gemini client is not initialized.")
-    
     try:
         response = await gemini_client.generate_content(
             message=task.input,
@@ -210,32 +349,7 @@ async def execute_single_task(task: AgentTask):
 async def get_agent_models():
     """
     Get recommended models for different agent task types.
-    
+
     Returns a mapping of task types to recommended models.
     """
-    return {
-        "task_routing": {
-            "creative": "gemini-2.5-pro",
-            "factual": "gemini-2.0-flash",
-            "reasoning": "gemini-2.5-pro",
-            "translation": "gemini-2.0-flash",
-            "summarization": "gemini-2.0-flash",
-            "research": "gemini-2.5-pro",
-            "code": "gemini-2.0-flash",
-            "vision": "gemini-2.5-pro"
-        },
-        "available_models": [
-            "gemini-2.0-flash",
-            "gemini-2.5-pro",
-            "gemini-1.5-flash",
-            "gpt-4",
-            "claude-3",
-            "grok-beta"
-        ],
-        "recommendations": {
-            "speed": "gemini-2.0-flash",
-            "quality": "gemini-2.5-pro",
-            "cost": "gemini-2.0-flash",
-            "reasoning": "gemini-2.5-pro"
-        }
-    }
+    return Response(content=_AGENT_MODELS_JSON, media_type="application/json")
@@ -1,18 +1,86 @@
 # src/app/endpoints/chat.py
+import hashlib
 import time
 import json
 from typing import AsyncGenerator
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from app.logger import logger
 from schemas.request import GeminiRequest, OpenAIChatRequest
 from app.services.gemini_client import get_gemini_client
 from app.services.session_manager import get_translate_session_manager
-from app.utils.tokens import count_tokens, count_messages_tokens
-from app.config import STREAMING_ENABLED
+from app.utils.tokens import count_tokens_pair
+from app.config import STREAMING_ENABLED, get_env_int
+
+# Try to use orjson's C-accelerated encoder for per-chunk serialization
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    _json_dumps_bytes = orjson.dumps
+except ImportError:
+    _json_dumps = json.dumps
+
+    def _json_dumps_bytes(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+# Prefer sse-starlette's EventSourceResponse for SSE framing/keep-alive;
+# fall back to hand-rolled framing over StreamingResponse
+try:
+    from sse_starlette.sse import EventSourceResponse
+    SSE_STARLETTE_AVAILABLE = True
+except ImportError:
+    SSE_STARLETTE_AVAILABLE = False
 
 router = APIRouter()
 
+# Buffered-flush knobs for streaming: flush accumulated deltas once the
+# buffer reaches SSE_CHUNK_BYTES or SSE_FLUSH_INTERVAL_MS has elapsed.
+# Tiny frames waste ASGI sends and TCP packets; the time bound keeps
+# first-token latency low when upstream trickles.
+SSE_CHUNK_BYTES = get_env_int("SSE_CHUNK_BYTES", 8192)
+SSE_FLUSH_INTERVAL_MS = get_env_int("SSE_FLUSH_INTERVAL_MS", 25)
+
+# Short-lived memoization of translate responses: browser extensions
+# retry aggressively, and a repeat of the same (model, message, files)
+# within the TTL can be served in-process instead of round-tripping to
+# Gemini. Bounded so the cache stays at a few MB worst case.
+_TRANSLATE_CACHE_MAX = 1024
+_TRANSLATE_CACHE_TTL = 60  # seconds
+_translate_cache: dict = {}
+
+
+def _translate_cache_key(request: GeminiRequest) -> tuple:
+    """Cache key for a translate request: (model, message, files digest)."""
+    files_hash = hashlib.blake2b(repr(request.files).encode(), digest_size=16).digest()
+    return (request.model, request.message, files_hash)
+
+
+def _translate_cache_get(key):
+    """Return the cached response text, or None if absent/expired."""
+    entry = _translate_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, text = entry
+    if time.monotonic() >= expires_at:
+        del _translate_cache[key]
+        return None
+    return text
+
+
+def _translate_cache_put(key, text: str) -> None:
+    """Store a response text, evicting expired then oldest entries at capacity."""
+    if len(_translate_cache) >= _TRANSLATE_CACHE_MAX:
+        now = time.monotonic()
+        for stale in [k for k, (exp, _) in _translate_cache.items() if exp <= now]:
+            del _translate_cache[stale]
+        # Dicts keep insertion order, so the first key is the oldest
+        if len(_translate_cache) >= _TRANSLATE_CACHE_MAX:
+            del _translate_cache[next(iter(_translate_cache))]
+    _translate_cache[key] = (time.monotonic() + _TRANSLATE_CACHE_TTL, text)
+
 
 @router.post("/translate")
 async def translate_chat(request: GeminiRequest):
@@ -24,8 +92,15 @@ async def translate_chat(request: GeminiRequest):
     session_manager = get_translate_session_manager()
     if not gemini_client or not session_manager:
         raise HTTPException(status_code=503, detail="Gemini client is not initialized.")
+
+    cache_key = _translate_cache_key(request)
+    cached = _translate_cache_get(cache_key)
+    if cached is not None:
+        return {"response": cached}
+
     try:
         response = await session_manager.get_response(request.model, request.message, request.files)
+        _translate_cache_put(cache_key, response.text)
         return {"response": response.text}
     except Exception as e:
         logger.error(f"Error in /translate endpoint: {e}", exc_info=True)
@@ -36,29 +111,33 @@ def convert_to_openai_format(
     response_text: str,
     model: str,
     prompt_text: str = "",
-    stream: bool = False
+    stream: bool = False,
+    chat_id: str = None
 ):
     """
     Convert Gemini response to OpenAI format with real token counting.
-    
+
     Args:
         response_text: Response from Gemini
         model: Model name
         prompt_text: Original prompt (for token counting)
         stream: Whether this is a streaming response
-        
+        chat_id: Pre-computed completion id (generated if omitted)
+
     Returns:
         OpenAI-formatted response dict
     """
-    # Count tokens
-    prompt_tokens = count_tokens(prompt_text, model) if prompt_text else 0
-    completion_tokens = count_tokens(response_text, model)
+    # Count both texts in one joint encode
+    prompt_tokens, completion_tokens = count_tokens_pair(prompt_text, response_text, model)
     total_tokens = prompt_tokens + completion_tokens
-    
+
+    # One timestamp per response - id and created always agree
+    created = int(time.time())
+
     return {
-        "id": f"chatcmpl-{int(time.time())}",
+        "id": chat_id or f"chatcmpl-{created}",
         "object": "chat.completion.chunk" if stream else "chat.completion",
-        "created": int(time.time()),
+        "created": created,
         "model": model,
         "choices": [
             {
@@ -78,74 +157,77 @@ def convert_to_openai_format(
     }
 
 
-async def stream_gemini_response(
+async def gemini_sse_payloads(
     gemini_client,
     user_message: str,
     model: str
 ) -> AsyncGenerator[str, None]:
     """
-    Stream Gemini response in OpenAI SSE format.
-    
+    Yield OpenAI-format SSE payloads (without `data:` framing).
+
+    Payloads are strings - the native frame type for
+    EventSourceResponse; the manual-framing fallback encodes each
+    finished frame to bytes exactly once.
+
     Args:
         gemini_client: Gemini client instance
         user_message: User's message
         model: Model name
-        
+
     Yields:
-        SSE-formatted chunks
+        JSON payload strings plus the terminal "[DONE]" sentinel
     """
     try:
-        # Note: This is a placeholder for actual streaming implementation
-        # The gemini-webapi library may not support streaming natively
-        # This simulates streaming by yielding the full response
-        
-        response = await gemini_client.generate_content(
+        # Everything but the delta content is identical across chunks -
+        # the completion id is rendered exactly once and becomes a
+        # constant substring of the prebuilt scaffolding, so only the
+        # content string is JSON-encoded per chunk
+        created = int(time.time())
+        chat_id = f"chatcmpl-{created}"
+        chunk_prefix = (
+            '{"id":"%s","object":"chat.completion.chunk",'
+            '"created":%d,"model":%s,"choices":[{"index":0,"delta":{"content":'
+            % (chat_id, created, _json_dumps(model))
+        )
+        chunk_suffix = '},"finish_reason":null}]}'
+
+        # Forward upstream deltas as they arrive, coalescing them with a
+        # size-or-time buffered flush so first tokens reach the client
+        # without sending one frame per tiny delta
+        buffer: list = []
+        buffered_len = 0
+        flush_interval = SSE_FLUSH_INTERVAL_MS / 1000
+        last_flush = time.monotonic()
+
+        async for output in gemini_client.generate_content_stream(
             message=user_message,
             model=model,
             files=None
-        )
-        
-        # Simulate streaming by chunking the response
-        chunk_size = 20  # Characters per chunk
-        text = response.text
-        
-        for i in range(0, len(text), chunk_size):
-            chunk = text[i:i + chunk_size]
-            
-            chunk_data = {
-                "id": f"chatcmpl-{int(time.time())}",
-                "object": "chat.completion.chunk",
-                "created": int(time.time()),
-                "model": model,
-                "choices": [
-                    {
-                        "index": 0,
-                        "delta": {"content": chunk},
-                        "finish_reason": None,
-                    }
-                ],
-            }
-            
-            yield f"data: {json.dumps(chunk_data)}\n\n"
-        
+        ):
+            delta = output.text_delta
+            if not delta:
+                continue
+            buffer.append(delta)
+            buffered_len += len(delta)
+            now = time.monotonic()
+            if buffered_len >= SSE_CHUNK_BYTES or now - last_flush >= flush_interval:
+                yield chunk_prefix + _json_dumps("".join(buffer)) + chunk_suffix
+                buffer.clear()
+                buffered_len = 0
+                last_flush = now
+
+        if buffer:
+            yield chunk_prefix + _json_dumps("".join(buffer)) + chunk_suffix
+
         # Send final chunk with finish_reason
-        final_chunk = {
-            "id": f"chatcmpl-{int(time.time())}",
-            "object": "chat.completion.chunk",
-            "created": int(time.time()),
-            "model": model,
-            "choices": [
-                {
-                    "index": 0,
-                    "delta": {},
-                    "finish_reason": "stop",
-                }
-            ],
-        }
-        
-        yield f"data: {json.dumps(final_chunk)}\n\n"
-        yield "data: [DONE]\n\n"
-        
+        yield (
+            '{"id":"%s","object":"chat.completion.chunk",'
+            '"created":%d,"model":%s,"choices":[{"index":0,"delta":{},'
+            '"finish_reason":"stop"}]}'
+            % (chat_id, created, _json_dumps(model))
+        )
+        yield "[DONE]"
+
     except Exception as e:
         logger.error(f"Error in streaming response: {e}", exc_info=True)
         error_data = {
@@ -154,7 +236,31 @@ async def stream_gemini_response(
                 "type": "server_error",
             }
         }
-        yield f"data: {json.dumps(error_data)}\n\n"
+        yield _json_dumps(error_data)
+
+
+async def stream_gemini_response(
+    gemini_client,
+    user_message: str,
+    model: str
+) -> AsyncGenerator[bytes, None]:
+    """
+    Stream Gemini response in OpenAI SSE format with manual framing.
+
+    Fallback used when sse-starlette is not installed. Each finished
+    frame is encoded to bytes exactly once so Starlette skips its
+    per-chunk UTF-8 encode.
+
+    Args:
+        gemini_client: Gemini client instance
+        user_message: User's message
+        model: Model name
+
+    Yields:
+        SSE-formatted byte frames
+    """
+    async for payload in gemini_sse_payloads(gemini_client, user_message, model):
+        yield ("data: " + payload + "\n\n").encode("utf-8")
 
 
 @router.post("/v1/chat/completions")
@@ -169,9 +275,10 @@ async def chat_completions(request: OpenAIChatRequest):
     if not gemini_client:
         raise HTTPException(status_code=503, detail="Gemini client is not initialized.")
     
-    # Extract the user message from the list of messages
+    # Extract the most recent user turn - scan from the end so long
+    # conversations stop at the first match
     user_message = next(
-        (msg.get("content") for msg in request.messages if msg.get("role") == "user"),
+        (msg.get("content") for msg in reversed(request.messages) if msg.get("role") == "user"),
         None
     )
     if not user_message:
@@ -181,10 +288,22 @@ async def chat_completions(request: OpenAIChatRequest):
         raise HTTPException(status_code=400, detail="Model not specified in the request.")
     
     model_value = request.model.value
-    
+
+    # One completion id per request; streamed responses render their own
+    # at stream start so id and created stay in step
+    chat_id = f"chatcmpl-{int(time.time())}"
+
     try:
         # Handle streaming if requested and enabled
         if is_stream and STREAMING_ENABLED:
+            if SSE_STARLETTE_AVAILABLE:
+                # EventSourceResponse does the framing, keep-alive pings
+                # and SSE headers itself
+                return EventSourceResponse(
+                    gemini_sse_payloads(gemini_client, user_message, model_value),
+                    ping=15,
+                    headers={"X-Accel-Buffering": "no"},  # Disable nginx buffering
+                )
             return StreamingResponse(
                 stream_gemini_response(gemini_client, user_message, model_value),
                 media_type="text/event-stream",
@@ -202,13 +321,17 @@ async def chat_completions(request: OpenAIChatRequest):
             files=None
         )
         
-        # Convert to OpenAI format with real token counting
-        return convert_to_openai_format(
+        # Convert to OpenAI format with real token counting; serialize
+        # here and return raw bytes so FastAPI skips its jsonable_encoder
+        # pass over the already-plain dict
+        payload = convert_to_openai_format(
             response.text,
             model_value,
             prompt_text=user_message,
-            stream=False
+            stream=False,
+            chat_id=chat_id
         )
+        return Response(content=_json_dumps_bytes(payload), media_type="application/json")
         
     except Exception as e:
         logger.error(f"Error in /v1/chat/completions endpoint: {e}", exc_info=True)
@@ -14,6 +14,11 @@ router = APIRouter()
 # Store startup time
 _startup_time = time.time()
 
+# TTL cache for /health so tight polling loops (load tests, orchestrator
+# probes) don't recompute and re-serialize the payload on every request
+_HEALTH_CACHE_TTL = float(get_env("HEALTH_CACHE_TTL", "30"))
+_health_cache = {"t": 0.0, "body": None}
+
 
 def get_uptime() -> float:
     """Get application uptime in seconds."""
@@ -25,12 +30,31 @@ async def health_check():
     """
     Basic health check endpoint.
     Returns 200 if the application is running.
+
+    Responses are cached for HEALTH_CACHE_TTL seconds (default 30);
+    the X-Cache header reports HIT or MISS.
     """
-    return {
+    now = time.monotonic()
+    cache_headers = {"Cache-Control": f"max-age={int(_HEALTH_CACHE_TTL)}"}
+
+    if _health_cache["body"] is not None and now - _health_cache["t"] < _HEALTH_CACHE_TTL:
+        return JSONResponse(
+            content=_health_cache["body"],
+            headers={"X-Cache": "HIT", **cache_headers},
+        )
+
+    body = {
         "status": "healthy",
         "environment": ENVIRONMENT,
         "uptime_seconds": round(get_uptime(), 2)
     }
+    _health_cache["t"] = now
+    _health_cache["body"] = body
+
+    return JSONResponse(
+        content=body,
+        headers={"X-Cache": "MISS", **cache_headers},
+    )
 
 
 @router.get("/health/live", tags=["Health"])
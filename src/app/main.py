@@ -1,5 +1,4 @@
 # src/app/main.py
-import os
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
@@ -9,12 +8,21 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from app.services.gemini_client import get_gemini_client
 from app.services.session_manager import init_session_managers
 from app.logger import logger
+from app import config
 from app.config import get_env, get_env_bool
 
 # Import middleware
 from app.middleware.auth import APIKeyMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 
+# Serialize responses with orjson when available (2-5x faster than the
+# stdlib encoder); fall back to the default JSONResponse otherwise
+try:
+    import orjson  # noqa: F401 - ORJSONResponse needs orjson at render time
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:
+    DefaultJSONResponse = JSONResponse
+
 
 class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
     """
@@ -22,8 +30,9 @@ class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
     Redirects HTTP requests to HTTPS.
     """
     async def dispatch(self, request: Request, call_next):
-        # Only enforce HTTPS in production
-        if os.getenv("ENVIRONMENT", "development") == "production":
+        # Only enforce HTTPS in production; the flag is a snapshot
+        # attribute, not a per-request env probe
+        if config.settings.is_production:
             # Check if request is not HTTPS
             if request.url.scheme != "https":
                 # Allow health checks on HTTP
@@ -74,6 +83,7 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=DefaultJSONResponse,
 )
 
 
@@ -105,7 +115,7 @@ logger.info("HTTPS redirect middleware added (active in production mode)")
 
 # Add security middleware
 # Note: Order matters! Auth should come before rate limiting
-auth_enabled = get_env_bool("API_AUTH_ENABLED", True)
+auth_enabled = config.settings.auth_enabled
 if auth_enabled:
     app.add_middleware(APIKeyMiddleware)
     logger.info("API Key authentication enabled")
@@ -113,7 +123,7 @@ else:
     logger.warning("API Key authentication is DISABLED - not recommended for production!")
 
 # Add rate limiting middleware
-rate_limit_enabled = get_env_bool("RATE_LIMIT_ENABLED", True)
+rate_limit_enabled = config.settings.rate_limit_enabled
 if rate_limit_enabled:
     app.add_middleware(RateLimitMiddleware)
     logger.info("Rate limiting enabled")
@@ -4,9 +4,11 @@ API Key Authentication Middleware for WebAI-to-API.
 
 Provides secure API key-based authentication for protecting endpoints.
 """
+import hashlib
 import logging
 import os
-from typing import List, Optional
+from functools import lru_cache
+from typing import FrozenSet, List, Optional
 from fastapi import Request, HTTPException, status
 from fastapi.security import APIKeyHeader
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -17,72 +19,108 @@ logger = logging.getLogger(__name__)
 API_KEY_HEADER_NAME = "X-API-Key"
 api_key_header = APIKeyHeader(name=API_KEY_HEADER_NAME, auto_error=False)
 
+# Endpoints that never require authentication
+_PUBLIC_ENDPOINTS = frozenset((
+    "/",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/health",
+    "/health/live",
+    "/health/ready",
+))
 
-def get_valid_api_keys() -> List[str]:
+# Prefixes covering the interactive docs assets
+_PUBLIC_PREFIXES = ("/docs", "/redoc")
+
+
+@lru_cache(maxsize=1)
+def _load_api_keys() -> FrozenSet[str]:
     """
-    Get list of valid API keys from environment variables.
-    
+    Load the valid API keys from the environment once per process.
+
     Returns:
-        List of valid API keys
+        Frozenset of valid API keys
     """
     api_keys_str = os.getenv("API_KEYS", "")
     if not api_keys_str:
         logger.warning("No API keys configured. API authentication is disabled!")
-        return []
-    
+        return frozenset()
+
     # Split by comma and strip whitespace
-    keys = [key.strip() for key in api_keys_str.split(",") if key.strip()]
-    
+    keys = frozenset(key.strip() for key in api_keys_str.split(",") if key.strip())
+
     if not keys:
         logger.warning("API_KEYS environment variable is empty!")
-    
+
     return keys
 
 
+@lru_cache(maxsize=1)
+def _load_hashed_keys() -> FrozenSet[bytes]:
+    """
+    Blake2b digests of the valid API keys.
+
+    Comparing fixed-length digests instead of raw secrets keeps the
+    membership check independent of where a candidate key diverges.
+    """
+    return frozenset(
+        hashlib.blake2b(key.encode(), digest_size=16).digest()
+        for key in _load_api_keys()
+    )
+
+
+def reset_api_key_cache() -> None:
+    """Clear the cached API keys after mutating API_KEYS (tests/reload)."""
+    _load_api_keys.cache_clear()
+    _load_hashed_keys.cache_clear()
+
+
+def get_valid_api_keys() -> List[str]:
+    """
+    Get list of valid API keys from environment variables.
+
+    Returns:
+        List of valid API keys
+    """
+    return list(_load_api_keys())
+
+
 def is_public_endpoint(path: str) -> bool:
     """
     Check if an endpoint is public (doesn't require authentication).
-    
+
     Args:
         path: Request path
-        
+
     Returns:
         True if endpoint is public, False otherwise
     """
-    public_endpoints = [
-        "/",
-        "/docs",
-        "/redoc",
-        "/openapi.json",
-        "/health",
-        "/health/live",
-        "/health/ready",
-    ]
-    
-    return path in public_endpoints or path.startswith("/docs") or path.startswith("/redoc")
+    return path in _PUBLIC_ENDPOINTS or path.startswith(_PUBLIC_PREFIXES)
 
 
 def verify_api_key(api_key: Optional[str]) -> bool:
     """
     Verify if the provided API key is valid.
-    
+
     Args:
         api_key: API key to verify
-        
+
     Returns:
         True if valid, False otherwise
     """
     if not api_key:
         return False
-    
-    valid_keys = get_valid_api_keys()
-    
+
+    hashed_keys = _load_hashed_keys()
+
     # If no keys are configured, allow access (development mode)
-    if not valid_keys:
+    if not hashed_keys:
         logger.debug("No API keys configured - allowing access")
         return True
-    
-    return api_key in valid_keys
+
+    digest = hashlib.blake2b(api_key.encode(), digest_size=16).digest()
+    return digest in hashed_keys
 
 
 class APIKeyMiddleware(BaseHTTPMiddleware):
@@ -107,17 +145,19 @@ class APIKeyMiddleware(BaseHTTPMiddleware):
         Raises:
             HTTPException: If API key is invalid or missing
         """
-        # Skip authentication for public endpoints
-        if is_public_endpoint(request.url.path):
+        # Skip authentication for public endpoints before touching the
+        # header map
+        path = request.url.path
+        if is_public_endpoint(path):
             return await call_next(request)
-        
+
         # Get API key from header
         api_key = request.headers.get(API_KEY_HEADER_NAME)
-        
+
         # Verify API key
         if not verify_api_key(api_key):
             logger.warning(
-                f"Unauthorized access attempt to {request.url.path} from {request.client.host}"
+                f"Unauthorized access attempt to {path} from {request.client.host}"
             )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -126,7 +166,7 @@ class APIKeyMiddleware(BaseHTTPMiddleware):
             )
         
         # Log successful authentication
-        logger.debug(f"Authenticated request to {request.url.path}")
+        logger.debug(f"Authenticated request to {path}")
         
         # Store API key in request state for potential use in endpoints
         request.state.api_key = api_key
@@ -4,106 +4,248 @@ Rate Limiting Middleware for WebAI-to-API.
 
 Provides request rate limiting to prevent abuse and ensure fair usage.
 """
+import itertools
 import logging
+import sys
 import time
 import os
-from typing import Dict, Tuple
-from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from collections import deque
 from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app import config
+
+# Optional Redis backend for rate limiting shared across workers
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+# Endpoints exempt from rate limiting (health probes, docs)
+_EXEMPT_ENDPOINTS = frozenset((
+    "/health",
+    "/health/live",
+    "/health/ready",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+))
+
+# Prefixes covering the interactive docs assets
+_EXEMPT_PREFIXES = ("/docs", "/redoc")
+
+# Number of identifier shards; power of two so the shard pick is a mask
+_SHARD_COUNT = 64
+
+# Sub-windows per rate window. Each identifier keeps a fixed ring of
+# per-bucket counts instead of one timestamp per request, so state and
+# per-check work are O(_BUCKET_COUNT) regardless of traffic
+_BUCKET_COUNT = 6
+
+
 class RateLimiter:
     """
-    Simple in-memory rate limiter using sliding window algorithm.
+    Simple in-memory rate limiter using a bucketed sliding window.
     For production with multiple instances, consider using Redis.
     """
-    
+
     def __init__(self, requests_per_minute: int = 60):
         """
         Initialize rate limiter.
-        
+
         Args:
             requests_per_minute: Maximum requests allowed per minute
         """
         self.requests_per_minute = requests_per_minute
         self.window_size = 60  # 1 minute in seconds
-        # Store: {identifier: [(timestamp1, timestamp2, ...)]}
-        self.requests: Dict[str, list] = defaultdict(list)
-    
+        self.bucket_size = self.window_size / _BUCKET_COUNT
+        # Identifiers are sharded across independent dicts so concurrent
+        # clients don't all hammer one hot dict; each shard maps
+        # {identifier: [last_bucket_index, deque of per-bucket counts]}
+        self.shards: list = [{} for _ in range(_SHARD_COUNT)]
+
+    def _shard_for(self, identifier: str) -> Dict[str, List]:
+        """Pick the shard holding this identifier's window."""
+        return self.shards[hash(identifier) & (_SHARD_COUNT - 1)]
+
     def is_allowed(self, identifier: str) -> Tuple[bool, Dict[str, str]]:
         """
         Check if request is allowed based on rate limit.
-        
+
         Args:
             identifier: Unique identifier (IP address or API key)
-            
+
         Returns:
             Tuple of (is_allowed, headers_dict)
         """
         current_time = time.time()
-        
-        # Clean old requests outside the window
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier]
-            if current_time - req_time < self.window_size
-        ]
-        
-        # Count requests in current window
-        request_count = len(self.requests[identifier])
-        
+        idx = int(current_time / self.bucket_size)
+        shard = self._shard_for(identifier)
+
+        entry = shard.get(identifier)
+        if entry is None:
+            buckets = deque((0,), maxlen=_BUCKET_COUNT)
+            entry = [idx, buckets]
+            shard[identifier] = entry
+        else:
+            last_idx, buckets = entry
+            if idx != last_idx:
+                # One empty bucket per elapsed sub-window; the ring's
+                # maxlen drops buckets that fell out of the window
+                for _ in range(min(idx - last_idx, _BUCKET_COUNT)):
+                    buckets.append(0)
+                entry[0] = idx
+        buckets = entry[1]
+
+        # Constant-time count: sum of a handful of small ints
+        request_count = sum(buckets)
+
         # Calculate remaining requests
         remaining = max(0, self.requests_per_minute - request_count)
-        
-        # Calculate reset time (next minute)
-        if self.requests[identifier]:
-            oldest_request = min(self.requests[identifier])
-            reset_time = int(oldest_request + self.window_size)
-        else:
-            reset_time = int(current_time + self.window_size)
-        
+
+        # The window frees up when the oldest occupied bucket expires
+        oldest_bucket_start = (idx - len(buckets) + 1) * self.bucket_size
+        reset_time = int(oldest_bucket_start + self.window_size)
+
         # Prepare rate limit headers
         headers = {
             "X-RateLimit-Limit": str(self.requests_per_minute),
             "X-RateLimit-Remaining": str(remaining),
             "X-RateLimit-Reset": str(reset_time),
         }
-        
+
         # Check if limit exceeded
         if request_count >= self.requests_per_minute:
             retry_after = reset_time - int(current_time)
             headers["Retry-After"] = str(max(1, retry_after))
             return False, headers
-        
-        # Add current request to the list
-        self.requests[identifier].append(current_time)
-        
+
+        # Count the current request in the newest bucket
+        buckets[-1] += 1
+
         return True, headers
-    
+
     def cleanup_old_entries(self):
         """
         Cleanup old entries to prevent memory leaks.
         Should be called periodically.
         """
-        current_time = time.time()
-        identifiers_to_remove = []
-        
-        for identifier, timestamps in self.requests.items():
-            # Remove timestamps outside the window
-            self.requests[identifier] = [
-                ts for ts in timestamps
-                if current_time - ts < self.window_size
+        cutoff_idx = int(time.time() / self.bucket_size) - _BUCKET_COUNT
+
+        for shard in self.shards:
+            # Identifiers idle for a full window have only expired buckets
+            identifiers_to_remove = [
+                identifier
+                for identifier, entry in shard.items()
+                if entry[0] <= cutoff_idx
             ]
-            
-            # Mark empty entries for removal
-            if not self.requests[identifier]:
-                identifiers_to_remove.append(identifier)
-        
-        # Remove empty entries
-        for identifier in identifiers_to_remove:
-            del self.requests[identifier]
+
+            for identifier in identifiers_to_remove:
+                del shard[identifier]
+
+
+# Sliding-window check executed atomically server-side: trim expired
+# members, count, conditionally record the request, and report when the
+# oldest member frees the window - one round-trip per request
+_SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local member = ARGV[4]
+
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', key, now, member)
+    redis.call('EXPIRE', key, math.ceil(window))
+    allowed = 1
+    count = count + 1
+end
+
+local reset = now + window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window
+end
+
+return {allowed, limit - count, reset}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Redis-backed sliding-window rate limiter.
+
+    Unlike the in-memory RateLimiter, the window lives in Redis, so the
+    count is shared across worker processes and survives restarts. Each
+    check is a single Lua script invocation (one round-trip).
+    """
+
+    def __init__(self, requests_per_minute: int = 60, url: Optional[str] = None, client=None):
+        """
+        Initialize the Redis rate limiter.
+
+        Args:
+            requests_per_minute: Maximum requests allowed per minute
+            url: Redis connection URL (falls back to REDIS_URL env)
+            client: Pre-built async Redis client (used by tests)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.window_size = 60  # 1 minute in seconds
+
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise RuntimeError(
+                    "RedisRateLimiter requires the 'redis' package; install it "
+                    "or unset REDIS_URL to use the in-memory limiter"
+                )
+            client = aioredis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+        self._redis = client
+        self._script = client.register_script(_SLIDING_WINDOW_LUA)
+        # Per-process counter keeping members unique within a timestamp
+        self._seq = itertools.count()
+
+    async def is_allowed(self, identifier: str) -> Tuple[bool, Dict[str, str]]:
+        """
+        Check if request is allowed based on rate limit.
+
+        Args:
+            identifier: Unique identifier (IP address or API key)
+
+        Returns:
+            Tuple of (is_allowed, headers_dict)
+        """
+        current_time = time.time()
+        member = f"{current_time:.6f}:{next(self._seq)}"
+
+        allowed, remaining, reset = await self._script(
+            keys=[f"ratelimit:{identifier}"],
+            args=[current_time, self.window_size, self.requests_per_minute, member],
+        )
+
+        reset_time = int(reset)
+        headers = {
+            "X-RateLimit-Limit": str(self.requests_per_minute),
+            "X-RateLimit-Remaining": str(max(0, int(remaining))),
+            "X-RateLimit-Reset": str(reset_time),
+        }
+
+        if not allowed:
+            retry_after = reset_time - int(current_time)
+            headers["Retry-After"] = str(max(1, retry_after))
+            return False, headers
+
+        return True, headers
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -125,11 +267,29 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         if requests_per_minute is None:
             requests_per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
         
-        self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("true", "1", "yes")
-        self.rate_limiter = RateLimiter(requests_per_minute)
-        
+        self.enabled = config.settings.rate_limit_enabled
+
+        # Prefer the shared Redis window when configured; each worker
+        # keeping its own counts both multiplies memory and effectively
+        # multiplies the limit by the worker count
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url and REDIS_AVAILABLE:
+            self.rate_limiter = RedisRateLimiter(requests_per_minute, url=redis_url)
+            self._distributed = True
+        else:
+            if redis_url:
+                logger.warning(
+                    "REDIS_URL is set but the 'redis' package is not installed; "
+                    "falling back to per-process in-memory rate limiting"
+                )
+            self.rate_limiter = RateLimiter(requests_per_minute)
+            self._distributed = False
+
         if self.enabled:
-            logger.info(f"Rate limiting enabled: {requests_per_minute} requests/minute")
+            backend = "redis" if self._distributed else "in-memory"
+            logger.info(
+                "Rate limiting enabled (%s): %d requests/minute", backend, requests_per_minute
+            )
         else:
             logger.info("Rate limiting disabled")
     
@@ -144,41 +304,37 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         Returns:
             Unique identifier string
         """
+        # Identifiers come from a bounded set (client IPs, key prefixes),
+        # so interning makes repeat dict lookups hash/compare the same
+        # string object instead of walking fresh per-request strings
+
         # Try to get API key from request state (set by auth middleware)
         api_key = getattr(request.state, "api_key", None)
         if api_key:
-            return f"key:{api_key[:8]}"  # Use first 8 chars for privacy
-        
+            return sys.intern(f"key:{api_key[:8]}")  # Use first 8 chars for privacy
+
         # Fall back to IP address
         client_host = request.client.host if request.client else "unknown"
-        
+
         # Check for forwarded IP (behind proxy)
         forwarded_for = request.headers.get("X-Forwarded-For")
         if forwarded_for:
             client_host = forwarded_for.split(",")[0].strip()
-        
-        return f"ip:{client_host}"
+
+        return sys.intern(f"ip:{client_host}")
     
-    def is_exempt_endpoint(self, path: str) -> bool:
+    @staticmethod
+    def is_exempt_endpoint(path: str) -> bool:
         """
         Check if endpoint is exempt from rate limiting.
-        
+
         Args:
             path: Request path
-            
+
         Returns:
             True if exempt, False otherwise
         """
-        exempt_endpoints = [
-            "/health",
-            "/health/live",
-            "/health/ready",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-        ]
-        
-        return path in exempt_endpoints or path.startswith("/docs") or path.startswith("/redoc")
+        return path in _EXEMPT_ENDPOINTS or path.startswith(_EXEMPT_PREFIXES)
     
     async def dispatch(self, request: Request, call_next):
         """
@@ -197,20 +353,25 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Skip if rate limiting is disabled
         if not self.enabled:
             return await call_next(request)
-        
-        # Skip exempt endpoints
-        if self.is_exempt_endpoint(request.url.path):
+
+        # Skip exempt endpoints before any identifier/state work so
+        # health probes and docs cost nothing beyond the path check
+        path = request.url.path
+        if self.is_exempt_endpoint(path):
             return await call_next(request)
-        
+
         # Get identifier for this request
         identifier = self.get_identifier(request)
         
         # Check rate limit
-        is_allowed, headers = self.rate_limiter.is_allowed(identifier)
+        if self._distributed:
+            is_allowed, headers = await self.rate_limiter.is_allowed(identifier)
+        else:
+            is_allowed, headers = self.rate_limiter.is_allowed(identifier)
         
         if not is_allowed:
             logger.warning(
-                f"Rate limit exceeded for {identifier} on {request.url.path}"
+                f"Rate limit exceeded for {identifier} on {path}"
             )
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
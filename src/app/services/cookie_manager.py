@@ -4,7 +4,9 @@ Cookie management service for automatic cookie refresh and monitoring.
 """
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Tuple
 from app.utils.browser import get_cookie_from_browser
 from app.config import get_env_bool, get_env_int
@@ -19,51 +21,71 @@ class CookieManager:
     
     def __init__(self):
         """Initialize cookie manager."""
+        # Elapsed-time checks run on the monotonic clock (immune to NTP
+        # jumps, plain float compares); the wall-clock timestamp is kept
+        # only for human-readable status output
+        self.last_refresh_mono = time.monotonic()
         self.last_refresh = datetime.now()
         self.refresh_interval_hours = get_env_int("COOKIE_REFRESH_INTERVAL_HOURS", 12)
+        self._refresh_interval_s = self.refresh_interval_hours * 3600
         self.auto_refresh_enabled = get_env_bool("COOKIE_AUTO_REFRESH", True)
         self.refresh_task: Optional[asyncio.Task] = None
         self._running = False
-    
+        # Error-path retry delay; doubles up to an hour on repeated
+        # failures and resets after a successful refresh
+        self._backoff_s = 60
+        # Set to stop the refresh loop immediately instead of waiting
+        # for a multi-hour sleep to unwind via cancellation
+        self._stop_event = asyncio.Event()
+
     async def start(self):
         """Start automatic cookie refresh if enabled."""
         if self.auto_refresh_enabled and not self._running:
             self._running = True
+            self._stop_event.clear()
             self.refresh_task = asyncio.create_task(self._auto_refresh_loop())
             logger.info(
-                f"Cookie auto-refresh started. "
-                f"Will refresh every {self.refresh_interval_hours} hours."
+                "Cookie auto-refresh started. Will refresh every %d hours.",
+                self.refresh_interval_hours,
             )
-    
+
     async def stop(self):
         """Stop automatic cookie refresh."""
         self._running = False
+        self._stop_event.set()
         if self.refresh_task:
-            self.refresh_task.cancel()
-            try:
-                await self.refresh_task
-            except asyncio.CancelledError:
-                pass
+            await self.refresh_task
             logger.info("Cookie auto-refresh stopped.")
-    
+
     async def _auto_refresh_loop(self):
         """Background task to automatically refresh cookies."""
         while self._running:
             try:
-                # Wait for refresh interval
-                await asyncio.sleep(self.refresh_interval_hours * 3600)
-                
-                # Check if refresh is needed
-                time_since_refresh = datetime.now() - self.last_refresh
-                if time_since_refresh >= timedelta(hours=self.refresh_interval_hours):
-                    await self.refresh_cookies()
-                
-            except asyncio.CancelledError:
-                break
+                # Wait for the refresh interval; the wait returns early
+                # only when stop() sets the event
+                if await self._wait_or_stop(self._refresh_interval_s):
+                    break
+
+                await self.refresh_cookies()
+
             except Exception as e:
-                logger.error(f"Error in cookie auto-refresh loop: {e}", exc_info=True)
-                # Wait a bit before retrying
-                await asyncio.sleep(300)  # 5 minutes
+                # Recurring failures (e.g. unreachable browser store)
+                # would render a traceback every cycle; keep the error
+                # line cheap and leave the traceback to debug level
+                logger.error("Error in cookie auto-refresh loop: %s", e)
+                logger.debug("Cookie auto-refresh loop traceback:", exc_info=True)
+                # Back off exponentially before retrying, still stoppable
+                if await self._wait_or_stop(self._backoff_s):
+                    break
+                self._backoff_s = min(self._backoff_s * 2, 3600)
+
+    async def _wait_or_stop(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds; True if stop was requested."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
     
     async def refresh_cookies(self) -> bool:
         """
@@ -85,7 +107,9 @@ class CookieManager:
                 # Note: This would require updating the Gemini client
                 # For now, we just log the success
                 logger.info("Successfully refreshed Gemini cookies from browser.")
+                self.last_refresh_mono = time.monotonic()
                 self.last_refresh = datetime.now()
+                self._backoff_s = 60
                 
                 # TODO: Implement actual client update
                 # await update_gemini_client(cookie_1psid, cookie_1psidts)
@@ -96,61 +120,68 @@ class CookieManager:
                 return False
                 
         except Exception as e:
-            logger.error(f"Error refreshing cookies: {e}", exc_info=True)
+            logger.error("Error refreshing cookies: %s", e)
+            logger.debug("Cookie refresh traceback:", exc_info=True)
             return False
     
+    def _is_refresh_needed(self, now_mono: float) -> bool:
+        """Check refresh against a caller-supplied monotonic timestamp."""
+        return now_mono - self.last_refresh_mono >= self._refresh_interval_s
+
+    def _seconds_until_refresh(self, now_mono: float) -> float:
+        """Seconds remaining until the next refresh, relative to `now_mono`."""
+        return self.last_refresh_mono + self._refresh_interval_s - now_mono
+
     def is_refresh_needed(self) -> bool:
         """
         Check if cookie refresh is needed based on time elapsed.
-        
+
         Returns:
             True if refresh is needed, False otherwise
         """
-        time_since_refresh = datetime.now() - self.last_refresh
-        return time_since_refresh >= timedelta(hours=self.refresh_interval_hours)
-    
+        return self._is_refresh_needed(time.monotonic())
+
     def get_time_until_refresh(self) -> timedelta:
         """
         Get time remaining until next scheduled refresh.
-        
+
         Returns:
             Timedelta until next refresh
         """
-        next_refresh = self.last_refresh + timedelta(hours=self.refresh_interval_hours)
-        return next_refresh - datetime.now()
-    
+        return timedelta(seconds=self._seconds_until_refresh(time.monotonic()))
+
     def get_status(self) -> dict:
         """
         Get current status of cookie manager.
-        
+
         Returns:
             Dict with status information
         """
+        # Read the clock once so every derived field agrees
+        now_mono = time.monotonic()
         return {
             "auto_refresh_enabled": self.auto_refresh_enabled,
             "refresh_interval_hours": self.refresh_interval_hours,
             "last_refresh": self.last_refresh.isoformat(),
-            "time_until_next_refresh_seconds": int(self.get_time_until_refresh().total_seconds()),
-            "refresh_needed": self.is_refresh_needed(),
+            "time_until_next_refresh_seconds": int(self._seconds_until_refresh(now_mono)),
+            "refresh_needed": self._is_refresh_needed(now_mono),
             "running": self._running,
         }
 
 
-# Global cookie manager instance
-_cookie_manager: Optional[CookieManager] = None
-
-
+@lru_cache(maxsize=1)
 def get_cookie_manager() -> CookieManager:
     """
     Get global cookie manager instance.
-    
+
+    lru_cache memoizes the singleton thread-safely at the C level, so
+    repeat calls are a plain cache hit with no None-check branch or
+    global rebinding.
+
     Returns:
         CookieManager instance
     """
-    global _cookie_manager
-    if _cookie_manager is None:
-        _cookie_manager = CookieManager()
-    return _cookie_manager
+    return CookieManager()
 
 
 async def init_cookie_manager():
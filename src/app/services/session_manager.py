@@ -1,5 +1,6 @@
 # src/app/services/session_manager.py
 import asyncio
+from functools import lru_cache
 from app.logger import logger
 from app.services.gemini_client import get_gemini_client
 
@@ -42,9 +43,17 @@ def init_session_managers():
     if client:
         _translate_session_manager = SessionManager(client)
         _gemini_chat_manager = SessionManager(client)
+        reset_session_managers()
 
+@lru_cache(maxsize=1)
 def get_translate_session_manager():
     return _translate_session_manager
 
+@lru_cache(maxsize=1)
 def get_gemini_chat_manager():
     return _gemini_chat_manager
+
+def reset_session_managers() -> None:
+    """Clear the cached manager lookups after init_session_managers or in tests."""
+    get_translate_session_manager.cache_clear()
+    get_gemini_chat_manager.cache_clear()
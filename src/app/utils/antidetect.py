@@ -0,0 +1,66 @@
+# src/app/utils/antidetect.py
+"""
+Anti-detection helpers for outbound Gemini requests.
+
+Kept out of the service modules so importing the client doesn't pull in
+request-pacing code until a request is actually made.
+"""
+import asyncio
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+# Anti-detection: Random user agents pool
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15"
+]
+
+# Hoisted so each draw is one RNG call and an index, no len() per call
+_UA_COUNT = len(USER_AGENTS)
+
+
+def get_random_user_agent() -> str:
+    """Get a random user agent for anti-detection."""
+    return USER_AGENTS[int(random.random() * _UA_COUNT)]
+
+
+def get_ua_for_client(client) -> str:
+    """
+    Sticky user agent for a client session.
+
+    Real browsers keep one UA for the whole session, so drawing a fresh
+    one per request both wastes RNG calls and looks less like a browser.
+    The UA is picked once per client and only changes via rotate_ua_for_client.
+    """
+    ua = getattr(client, "_sticky_ua", None)
+    if ua is None:
+        ua = get_random_user_agent()
+        client._sticky_ua = ua
+    return ua
+
+
+def rotate_ua_for_client(client) -> str:
+    """Reselect the session user agent after an auth failure or block."""
+    client._ua_rotate_count = getattr(client, "_ua_rotate_count", 0) + 1
+    client._sticky_ua = get_random_user_agent()
+    logger.debug("Rotated user agent for client (rotation #%d)", client._ua_rotate_count)
+    return client._sticky_ua
+
+
+async def anti_detection_delay():
+    """
+    Add random delay between requests to avoid detection.
+    Uses exponential backoff with jitter.
+    """
+    # Random delay between 1 and 3.5 seconds (base 1-3s plus up to 0.5s
+    # jitter, collapsed into a single RNG draw)
+    total_delay = 1.0 + random.random() * 2.5
+
+    # Deferred %-formatting: nothing is rendered when DEBUG is filtered
+    logger.debug("Anti-detection delay: %.2fs", total_delay)
+    await asyncio.sleep(total_delay)
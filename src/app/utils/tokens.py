@@ -5,10 +5,38 @@ Token counting utilities for WebAI-to-API.
 Provides functions to count tokens and estimate costs for different models.
 """
 import logging
+import sys
+from functools import lru_cache
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Texts at or below this length go through the piece cache; repeat
+# prompts (system prompts, short user messages) then cost a dict lookup
+# instead of a full BPE pass
+_PIECE_CACHE_MAX_CHARS = 2048
+
+# Gemini models mapped to equivalent OpenAI encodings
+_ENCODING_MAP = {
+    "gemini-1.5-flash": "cl100k_base",
+    "gemini-2.0-flash": "cl100k_base",
+    "gemini-2.5-pro": "cl100k_base",
+    "gemini-3.0-pro": "cl100k_base",
+}
+
+# Approximate pricing per 1M tokens as (input, output) tuples; keys are
+# interned so lookups with interned model names compare by identity -
+# UPDATE THESE WITH ACTUAL PRICING
+_PRICING = {
+    sys.intern("gemini-1.5-flash"): (0.075, 0.30),
+    sys.intern("gemini-2.0-flash"): (0.075, 0.30),
+    sys.intern("gemini-2.5-pro"): (1.25, 5.00),
+    sys.intern("gemini-3.0-pro"): (1.25, 5.00),
+    sys.intern("gpt-3.5-turbo"): (0.50, 1.50),
+    sys.intern("gpt-4"): (30.00, 60.00),
+}
+_DEFAULT_PRICING = (0.10, 0.30)
+
 # Try to import tiktoken for accurate token counting
 try:
     import tiktoken
@@ -18,45 +46,51 @@ except ImportError:
     logger.warning("tiktoken not available. Token counting will use approximations.")
 
 
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """
+    Resolve the tiktoken encoding for a model.
+
+    Args:
+        model: Model name
+
+    Returns:
+        tiktoken Encoding instance, or None if tiktoken is unavailable
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+
+    encoding_name = _ENCODING_MAP.get(model)
+    if encoding_name is not None:
+        return tiktoken.get_encoding(encoding_name)
+
+    # Try to get encoding for model directly
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Fall back to cl100k_base (GPT-4 encoding)
+        return tiktoken.get_encoding("cl100k_base")
+
+
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     """
     Count tokens in text for a given model.
-    
+
     Args:
         text: Text to count tokens for
         model: Model name (used to select appropriate encoding)
-        
+
     Returns:
         Number of tokens
     """
     if not text:
         return 0
-    
+
     if TIKTOKEN_AVAILABLE:
         try:
-            # Map Gemini models to equivalent OpenAI encodings
-            encoding_map = {
-                "gemini-1.5-flash": "cl100k_base",
-                "gemini-2.0-flash": "cl100k_base",
-                "gemini-2.5-pro": "cl100k_base",
-                "gemini-3.0-pro": "cl100k_base",
-            }
-            
-            # Get encoding name
-            if model in encoding_map:
-                encoding_name = encoding_map[model]
-            else:
-                # Try to get encoding for model directly
-                try:
-                    encoding = tiktoken.encoding_for_model(model)
-                    return len(encoding.encode(text))
-                except KeyError:
-                    # Fall back to cl100k_base (GPT-4 encoding)
-                    encoding_name = "cl100k_base"
-            
-            encoding = tiktoken.get_encoding(encoding_name)
-            return len(encoding.encode(text))
-            
+            if len(text) <= _PIECE_CACHE_MAX_CHARS:
+                return _count_piece(text, model)
+            return len(_get_encoding(model).encode(text))
         except Exception as e:
             logger.warning(f"Error counting tokens with tiktoken: {e}. Using approximation.")
             return _approximate_token_count(text)
@@ -64,19 +98,66 @@ def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
         return _approximate_token_count(text)
 
 
+@lru_cache(maxsize=8192)
+def _count_piece(text: str, model: str) -> int:
+    """Cached token count for short texts; repeat pieces are free."""
+    return len(_get_encoding(model).encode(text))
+
+
+def count_tokens_pair(prompt: str, completion: str, model: str = "gpt-3.5-turbo") -> tuple:
+    """
+    Count prompt and completion tokens with a single encoder fetch.
+
+    Both texts share the model's encoding, so one encode_batch call
+    covers them instead of two independent count_tokens passes.
+
+    Args:
+        prompt: Prompt text (may be empty)
+        completion: Completion text
+        model: Model name (used to select appropriate encoding)
+
+    Returns:
+        Tuple of (prompt_tokens, completion_tokens)
+    """
+    if TIKTOKEN_AVAILABLE:
+        try:
+            encoding = _get_encoding(model)
+            prompt_count, completion_count = (
+                len(tokens) for tokens in encoding.encode_batch([prompt, completion])
+            )
+            return prompt_count, completion_count
+        except Exception as e:
+            logger.warning(f"Error counting tokens with tiktoken: {e}. Using approximation.")
+    return _approximate_token_count(prompt), _approximate_token_count(completion)
+
+
 def _approximate_token_count(text: str) -> int:
     """
     Approximate token count using simple heuristic.
-    Roughly 1 token per 4 characters for English text.
-    
+    Roughly 1 token per 4 UTF-8 bytes.
+
     Args:
         text: Text to count tokens for
-        
+
     Returns:
         Approximate number of tokens
     """
-    # Simple approximation: ~4 characters per token
-    return len(text) // 4
+    # Byte length tracks BPE behaviour better than code-point length:
+    # CJK text expands to ~3 bytes per character and correspondingly
+    # more tokens, while ASCII stays at the familiar 4-chars-per-token.
+    # Rounding up keeps the estimate conservative for truncation checks.
+    return (len(text.encode("utf-8", errors="ignore")) + 3) // 4
+
+
+# Joins message contents for one-shot encoding; NUL does not appear in
+# chat text and tokenizes independently of its neighbours
+_MESSAGE_SEPARATOR = "\x00"
+
+
+@lru_cache(maxsize=None)
+def _separator_token_count(model: str) -> int:
+    """Token cost of the join separator under this model's encoding."""
+    return len(_get_encoding(model).encode(_MESSAGE_SEPARATOR))
 
 
 def count_messages_tokens(messages: list, model: str = "gpt-3.5-turbo") -> int:
@@ -90,20 +171,31 @@ def count_messages_tokens(messages: list, model: str = "gpt-3.5-turbo") -> int:
     Returns:
         Total number of tokens
     """
-    total_tokens = 0
-    
-    for message in messages:
-        # Count tokens in content
-        content = message.get("content", "")
-        total_tokens += count_tokens(content, model)
-        
-        # Add overhead for message formatting (role, etc.)
-        # OpenAI uses ~4 tokens per message for formatting
-        total_tokens += 4
-    
+    contents = [message.get("content", "") for message in messages]
+
+    if TIKTOKEN_AVAILABLE:
+        try:
+            # Join the contents on NUL and encode once: a single FFI
+            # round-trip instead of one per message. NUL never merges
+            # with neighbouring BPE pieces, so its token cost can be
+            # subtracted exactly afterwards.
+            encoding = _get_encoding(model)
+            total_tokens = len(encoding.encode(_MESSAGE_SEPARATOR.join(contents)))
+            if len(contents) > 1:
+                total_tokens -= _separator_token_count(model) * (len(contents) - 1)
+        except Exception as e:
+            logger.warning(f"Error counting tokens with tiktoken: {e}. Using approximation.")
+            total_tokens = sum(_approximate_token_count(content) for content in contents)
+    else:
+        total_tokens = sum(_approximate_token_count(content) for content in contents)
+
+    # Add overhead for message formatting (role, etc.)
+    # OpenAI uses ~4 tokens per message for formatting
+    total_tokens += 4 * len(messages)
+
     # Add overhead for conversation formatting
     total_tokens += 2
-    
+
     return total_tokens
 
 
@@ -119,21 +211,24 @@ def truncate_to_limit(text: str, max_tokens: int, model: str = "gpt-3.5-turbo")
     Returns:
         Truncated text
     """
-    current_tokens = count_tokens(text, model)
-    
-    if current_tokens <= max_tokens:
+    if TIKTOKEN_AVAILABLE:
+        try:
+            # Encode once, slice the token list, decode back - exact and
+            # O(n), instead of re-encoding shrinking prefixes in a loop
+            encoding = _get_encoding(model)
+            tokens = encoding.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            return encoding.decode(tokens[:max_tokens])
+        except Exception as e:
+            logger.warning(f"Error truncating with tiktoken: {e}. Using approximation.")
+
+    # Approximate fallback: shrink by characters until the estimate fits
+    if _approximate_token_count(text) <= max_tokens:
         return text
-    
-    # Estimate characters to keep
-    chars_per_token = len(text) / current_tokens
-    target_chars = int(max_tokens * chars_per_token * 0.95)  # 95% to be safe
-    
-    truncated = text[:target_chars]
-    
-    # Verify and adjust if needed
-    while count_tokens(truncated, model) > max_tokens:
+    truncated = text[:max_tokens * 4]
+    while _approximate_token_count(truncated) > max_tokens:
         truncated = truncated[:int(len(truncated) * 0.9)]
-    
     return truncated
 
 
@@ -156,22 +251,12 @@ def estimate_cost(
     Returns:
         Dict with cost information
     """
-    # Approximate pricing (per 1M tokens) - UPDATE THESE WITH ACTUAL PRICING
-    pricing = {
-        "gemini-1.5-flash": {"input": 0.075, "output": 0.30},
-        "gemini-2.0-flash": {"input": 0.075, "output": 0.30},
-        "gemini-2.5-pro": {"input": 1.25, "output": 5.00},
-        "gemini-3.0-pro": {"input": 1.25, "output": 5.00},
-        "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
-        "gpt-4": {"input": 30.00, "output": 60.00},
-    }
-    
     # Get pricing for model or use default
-    model_pricing = pricing.get(model, {"input": 0.10, "output": 0.30})
-    
+    input_price, output_price = _PRICING.get(model, _DEFAULT_PRICING)
+
     # Calculate costs (per million tokens)
-    input_cost = (prompt_tokens / 1_000_000) * model_pricing["input"]
-    output_cost = (completion_tokens / 1_000_000) * model_pricing["output"]
+    input_cost = prompt_tokens * input_price / 1_000_000
+    output_cost = completion_tokens * output_price / 1_000_000
     total_cost = input_cost + output_cost
     
     return {
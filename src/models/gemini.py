@@ -20,6 +20,16 @@ class MyGeminiClient:
         """
         return await self.client.generate_content(message, model=model, files=files)
 
+    async def generate_content_stream(self, message: str, model: str, files: Optional[List[Union[str, Path]]] = None):
+        """
+        Generate content in streaming mode, yielding partial outputs.
+
+        Each yielded output carries a `text_delta` with only the new
+        characters received since the previous yield.
+        """
+        async for output in self.client.generate_content_stream(message, model=model, files=files):
+            yield output
+
     async def close(self) -> None:
         """Close the Gemini client."""
         await self.client.close()
@@ -1,13 +1,16 @@
 # src/run.py
 import argparse
 import asyncio
+import functools
 import uvicorn
 import multiprocessing
 import time
 import sys
 import threading
 import os
+import selectors
 import signal
+from pathlib import Path
 from typing import Dict, Union, Tuple
 from fastapi.routing import APIRoute
 from typing import TYPE_CHECKING
@@ -16,28 +19,34 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from multiprocessing.synchronize import Event as MultiprocessingEvent
 
-# Import tomli to read pyproject.toml
-try:
-    import tomli
-except ImportError:
-    # For Python 3.11+, tomllib is in the standard library
-    try:
-        import tomllib as tomli
-    except ImportError:
-        tomli = None
-
 # --- App and Service Imports ---
 from app.config import load_config
 from app.main import app as webai_app
 from app.services.gemini_client import init_gemini_client
 
-# Conditionally import g4f runner function
-try:
-    from g4f.api import run_api as run_g4f_api
 
-    G4F_AVAILABLE = True
-except ImportError:
-    G4F_AVAILABLE = False
+# g4f drags in a very large dependency tree (providers, aiohttp stacks),
+# and tomli is only needed to print the banner - both are imported on
+# first use so WebAI-only startup doesn't pay for them
+def _import_tomli():
+    """Return a TOML parser module, or None if none is available."""
+    try:
+        import tomllib as tomli  # Python 3.11+ standard library
+    except ImportError:
+        try:
+            import tomli
+        except ImportError:
+            return None
+    return tomli
+
+
+def _import_g4f_runner():
+    """Return g4f's run_api on first use, or None if g4f is missing."""
+    try:
+        from g4f.api import run_api
+    except ImportError:
+        return None
+    return run_api
 
 
 # Helper class for terminal colors
@@ -52,14 +61,31 @@ class Colors:
     BOLD = "\033[1m"
 
 
+# Static banner fragments, rendered once at import instead of rebuilding
+# the colored strings on every print_server_info call
+_BANNER_EQ = "=" * 80
+_INSTRUCTION_TEXT = "Press '1' then Enter for WebAI (Faster) | '2' then Enter for gpt4free | Ctrl+C to Quit"
+_INSTRUCTION_LINE = Colors.BOLD + Colors.YELLOW + _INSTRUCTION_TEXT.center(80) + Colors.RESET
+_G4F_USAGE_NOTES = (
+    f"\n{Colors.BOLD}{Colors.YELLOW}IMPORTANT USAGE NOTES FOR gpt4free MODE:{Colors.RESET}\n"
+    f"  - {Colors.YELLOW}To avoid {Colors.BOLD}ProviderNotFoundError{Colors.RESET}{Colors.YELLOW}, "
+    f"your client must send a valid provider name (not a model name).{Colors.RESET}\n"
+    f"    {Colors.YELLOW}Check the list of valid providers at the "
+    f"{Colors.CYAN}/v1/providers{Colors.YELLOW} endpoint.{Colors.RESET}"
+)
+
+
 # --- Helper function to get app info ---
+@functools.lru_cache(maxsize=1)
 def get_app_info() -> Tuple[str, str]:
-    """Reads application name and version from pyproject.toml."""
+    """Reads application name and version from pyproject.toml (once)."""
+    tomli = _import_tomli()
     if not tomli:
         return "WebAI to API", "N/A (tomli not installed)"
     try:
-        with open("pyproject.toml", "rb") as f:
-            toml_data = tomli.load(f)
+        # One read_bytes syscall + in-memory parse instead of streaming
+        # the file through buffered IO
+        toml_data = tomli.loads(Path("pyproject.toml").read_bytes().decode("utf-8"))
         poetry_data = toml_data.get("tool", {}).get("poetry", {})
         name = poetry_data.get("name", "WebAI-to-API").replace("-", " ").title()
         version = poetry_data.get("version", "N/A")
@@ -68,16 +94,48 @@ def get_app_info() -> Tuple[str, str]:
         return "WebAI-to-API", "N/A"
 
 
+@functools.lru_cache(maxsize=1)
+def _get_sorted_api_paths() -> Tuple[str, ...]:
+    """Sorted route paths of the WebAI app; the table never changes at runtime."""
+    return tuple(sorted(
+        set(
+            route.path
+            for route in webai_app.routes
+            if isinstance(route, APIRoute)
+        )
+    ))
+
+
 # --- UNIFIED Server Runner Functions ---
 
 
+def _configure_event_loop(reload: bool = False):
+    """
+    Pick the fastest event loop for the platform.
+
+    On Windows the Proactor (IOCP) loop is measurably quicker for socket
+    workloads; --reload still needs the selector loop for its subprocess
+    handling. On POSIX, uvloop is installed when available.
+    """
+    if sys.platform == "win32":
+        if reload:
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        else:
+            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    else:
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+
+
 def start_webai_server(
     host: str, port: int, reload: bool, stop_event: "MultiprocessingEvent"
 ):
     """Starts the WebAI Uvicorn server with a graceful shutdown mechanism."""
     signal.signal(signal.SIGINT, signal.SIG_IGN)
-    if sys.platform == "win32":
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    _configure_event_loop(reload)
 
     config = uvicorn.Config(
         webai_app, host=host, port=port, reload=reload, log_config=None
@@ -98,9 +156,13 @@ def start_webai_server(
 
 def start_g4f_server(host: str, port: int, stop_event: "MultiprocessingEvent"):
     """Starts the G4F server with a graceful shutdown mechanism."""
+    run_g4f_api = _import_g4f_runner()
+    if run_g4f_api is None:
+        print(f"{Colors.RED}g4f is not installed; cannot start g4f mode.{Colors.RESET}")
+        return
+
     signal.signal(signal.SIGINT, signal.SIG_IGN)
-    if sys.platform == "win32":
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    _configure_event_loop()
 
     def shutdown_monitor():
         stop_event.wait()
@@ -115,17 +177,48 @@ def start_g4f_server(host: str, port: int, stop_event: "MultiprocessingEvent"):
 
 
 # --- Standard Input Listener ---
-def input_listener(shared_state: Dict):
-    """Listens for user input in a separate thread to avoid blocking."""
-    while True:
-        try:
-            choice = input()
-            if choice == "1":
-                shared_state["requested_mode"] = "webai"
-            elif choice == "2":
-                shared_state["requested_mode"] = "g4f"
-        except (EOFError, KeyboardInterrupt):
-            break
+def _apply_mode_choice(choice: str, shared_state: Dict):
+    """Map a keypress to a requested server mode."""
+    if choice == "1":
+        shared_state["requested_mode"] = "webai"
+    elif choice == "2":
+        shared_state["requested_mode"] = "g4f"
+
+
+def input_listener(shared_state: Dict, stop_event=None):
+    """
+    Listens for user input without parking a thread inside input().
+
+    On POSIX, stdin is watched through a selector with a short timeout so
+    the listener can observe `stop_event` and exit promptly instead of
+    blocking until the next line. Windows can't select() on stdin, so it
+    falls back to the blocking read loop.
+    """
+    if sys.platform == "win32":
+        while stop_event is None or not stop_event.is_set():
+            try:
+                _apply_mode_choice(input(), shared_state)
+            except (EOFError, KeyboardInterrupt):
+                break
+        return
+
+    sel = selectors.DefaultSelector()
+    try:
+        sel.register(sys.stdin, selectors.EVENT_READ)
+    except (ValueError, OSError):
+        return  # stdin is closed or not selectable
+    try:
+        while stop_event is None or not stop_event.is_set():
+            if not sel.select(timeout=0.1):
+                continue
+            line = sys.stdin.readline()
+            if not line:  # EOF
+                break
+            _apply_mode_choice(line.strip(), shared_state)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sel.close()
 
 
 # --- Helper Function for Printing Info ---
@@ -135,11 +228,11 @@ def print_server_info(host: str, port: int, mode: str):
     base_url = f"{protocol}://{host}:{port}"
     app_name, app_version = get_app_info()
     app_info_line = f"{app_name} v{app_version}".center(80)
-    print("\n" + "=" * 80)
+    print("\n" + _BANNER_EQ)
     print(f"{Colors.BOLD}{Colors.YELLOW}{app_info_line}{Colors.RESET}")
     if mode == "webai":
         print("🚀 WebAI-to-API Server is RUNNING (Primary Mode) 🚀".center(80))
-        print("=" * 80)
+        print(_BANNER_EQ)
         print("\n✨ Available Services:")
         print(f"  - Docs (Swagger): {base_url}/docs")
         print("\n⚙️ Config.conf:")
@@ -150,16 +243,7 @@ def print_server_info(host: str, port: int, mode: str):
         except Exception:
             print("  - Could not load config details.")
         print("\n🔗 API Endpoints:")
-        paths = sorted(
-            list(
-                set(
-                    route.path
-                    for route in webai_app.routes
-                    if isinstance(route, APIRoute)
-                )
-            )
-        )
-        for path in paths:
+        for path in _get_sorted_api_paths():
             if path.startswith("/") and path not in [
                 "/docs",
                 "/redoc",
@@ -168,7 +252,7 @@ def print_server_info(host: str, port: int, mode: str):
                 print(f"  - {base_url}{path}")
     elif mode == "g4f":
         print("🚀 gpt4free Server is RUNNING 🚀".center(80))
-        print("=" * 80)
+        print(_BANNER_EQ)
         g4f_base_url = f"{base_url}/v1"
         print("\n✨ gpt4free Service Info:")
         print(f"  - Base URL: {g4f_base_url}")
@@ -180,22 +264,10 @@ def print_server_info(host: str, port: int, mode: str):
         print(f"  - Chat Completions: {g4f_base_url}/chat/completions")
         print(f"  - Image Generation: {g4f_base_url}/images/generate")
 
-        print(
-            f"\n{Colors.BOLD}{Colors.YELLOW}IMPORTANT USAGE NOTES FOR gpt4free MODE:{Colors.RESET}"
-        )
-        print(
-            f"  - {Colors.YELLOW}To avoid {Colors.BOLD}ProviderNotFoundError{Colors.RESET}{Colors.YELLOW}, your client must send a valid provider name (not a model name).{Colors.RESET}"
-        )
-        print(
-            f"    {Colors.YELLOW}Check the list of valid providers at the {Colors.CYAN}/v1/providers{Colors.YELLOW} endpoint.{Colors.RESET}"
-        )
-    print("\n" + "=" * 80)
-    instruction_text = "Press '1' then Enter for WebAI (Faster) | '2' then Enter for gpt4free | Ctrl+C to Quit"
-    colored_instructions = (
-        f"{Colors.BOLD}{Colors.YELLOW}{instruction_text.center(80)}{Colors.RESET}"
-    )
-    print(colored_instructions)
-    print("=" * 80)
+        print(_G4F_USAGE_NOTES)
+    print("\n" + _BANNER_EQ)
+    print(_INSTRUCTION_LINE)
+    print(_BANNER_EQ)
 
 
 # --- Main Execution Block ---
@@ -206,15 +278,16 @@ if __name__ == "__main__":
     
     # Windows fix
     if sys.platform == "win32":
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
         multiprocessing.freeze_support()
-    
+
     # Parse args
     parser = argparse.ArgumentParser(description="WebAI-to-API Server")
     parser.add_argument("--host", type=str, default="localhost", help="Host address")
     parser.add_argument("--port", type=int, default=6969, help="Port number")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
     args = parser.parse_args()
+
+    _configure_event_loop(args.reload)
     
     # Check if Gemini client can initialize
     print("INFO:     Checking Gemini client (cookies)...")
@@ -0,0 +1,33 @@
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print("WebAI-to-API v0.5.0 - FORCED WEBAI MODE (Cookies)")
+    print("="*80)
+    
+    # Windows fix
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        multiprocessing.freeze_support()
+    
+    # Parse args
+    parser = argparse.ArgumentParser(description="WebAI-to-API Server")
+    parser.add_argument("--host", type=str, default="localhost", help="Host address")
+    parser.add_argument("--port", type=int, default=6969, help="Port number")
+    parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+    args = parser.parse_args()
+    
+    # Check if Gemini client can initialize
+    print("INFO:     Checking Gemini client (cookies)...")
+    webai_is_available = asyncio.run(init_gemini_client())
+    
+    if not webai_is_available:
+        print("ERROR:    Gemini client failed to initialize. Check cookies in .env")
+        sys.exit(1)
+    
+    print("INFO:     ✅ Gemini client initialized successfully")
+    print("INFO:     🚀 Starting server in WEBAI mode (forced)")
+    print(f"INFO:     Server will run on http://{args.host}:{args.port}")
+    print("="*80)
+    
+    # Start WebAI server directly - NO INPUT REQUIRED
+    stop_event = multiprocessing.Event()
+    start_webai_server(args.host, args.port, args.reload, stop_event)
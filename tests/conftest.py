@@ -3,7 +3,9 @@
 Pytest configuration and shared fixtures for WebAI-to-API tests.
 """
 import pytest
+import pytest_asyncio
 import os
+import httpx
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, AsyncMock
 
@@ -22,25 +24,47 @@ def setup_test_environment():
     os.environ["API_KEYS"] = "test-api-key-12345678901234567890"
     os.environ["ALLOWED_ORIGINS"] = "*"
     os.environ["LOG_LEVEL"] = "ERROR"  # Reduce log noise in tests
-    
+
+    # Rebuild the cached settings snapshot with the test values
+    from app.config import reset_settings
+    reset_settings()
+
     yield
     
     # Cleanup after all tests
     pass
 
 
-@pytest.fixture
-def client():
+@pytest.fixture(scope="session")
+def client(setup_test_environment):
     """
     Create a test client for the FastAPI app.
+
+    Session-scoped so the ASGI lifespan (startup/shutdown) runs once for
+    the whole suite instead of once per test.
     """
     # Import here to avoid circular imports and ensure env vars are set
     from app.main import app
-    
-    with TestClient(app) as test_client:
+
+    with TestClient(app, raise_server_exceptions=False) as test_client:
         yield test_client
 
 
+@pytest_asyncio.fixture(loop_scope="session", scope="session")
+async def async_client(setup_test_environment):
+    """
+    In-process async client over ASGITransport.
+
+    Async tests talk to the app directly on the event loop - no socket
+    and no per-call thread hop like the sync TestClient.
+    """
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
 @pytest.fixture
 def mock_gemini_client():
     """
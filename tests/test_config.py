@@ -4,7 +4,25 @@ Tests for configuration management.
 """
 import pytest
 import os
-from app.config import get_env, get_env_bool, get_env_int, validate_config, load_config
+from app.config import (
+    get_env,
+    get_env_bool,
+    get_env_int,
+    invalidate_env_cache,
+    validate_config,
+    load_config,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_env_cache():
+    """
+    Reset the cached env lookups around each test, since these tests
+    mutate os.environ directly.
+    """
+    invalidate_env_cache()
+    yield
+    invalidate_env_cache()
 
 
 class TestConfigHelpers:
@@ -29,6 +47,7 @@ class TestConfigHelpers:
         
         for val in true_values:
             os.environ["TEST_BOOL"] = val
+            invalidate_env_cache()
             assert get_env_bool("TEST_BOOL") is True
         
         del os.environ["TEST_BOOL"]
@@ -39,6 +58,7 @@ class TestConfigHelpers:
         
         for val in false_values:
             os.environ["TEST_BOOL"] = val
+            invalidate_env_cache()
             assert get_env_bool("TEST_BOOL") is False
         
         del os.environ["TEST_BOOL"]
@@ -2,9 +2,13 @@
 """
 Tests for health check endpoints.
 """
+import orjson
 import pytest
 from fastapi import status
 
+# Acceptable readiness states, allocated once at import
+_READY_OK = frozenset({status.HTTP_200_OK, status.HTTP_503_SERVICE_UNAVAILABLE})
+
 
 class TestHealthEndpoints:
     """Test suite for health check endpoints."""
@@ -14,11 +18,25 @@ class TestHealthEndpoints:
         response = client.get("/health")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["status"] == "healthy"
         assert "uptime_seconds" in data
         assert "environment" in data
-    
+
+    def test_health_check_cached(self, client):
+        """Test that repeated health checks hit the TTL cache."""
+        from app.endpoints import health
+
+        # Start from an empty cache so the first probe is a MISS
+        health._health_cache["body"] = None
+
+        first = client.get("/health")
+        second = client.get("/health")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.json() == first.json()
+
     def test_liveness_check(self, client):
         """Test liveness probe endpoint."""
         response = client.get("/health/live")
@@ -32,7 +50,7 @@ class TestHealthEndpoints:
         response = client.get("/health/ready")
         
         # May be 200 or 503 depending on if Gemini client is initialized
-        assert response.status_code in [status.HTTP_200_OK, status.HTTP_503_SERVICE_UNAVAILABLE]
+        assert response.status_code in _READY_OK
         data = response.json()
         assert "status" in data
         assert "checks" in data
@@ -43,7 +61,7 @@ class TestHealthEndpoints:
         response = client.get("/metrics")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "uptime_seconds" in data
         assert "environment" in data
         assert "gemini_available" in data
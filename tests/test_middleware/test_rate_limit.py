@@ -2,50 +2,77 @@
 """
 Tests for rate limiting middleware.
 """
+import asyncio
 import pytest
-import os
 from fastapi import status
 
 
+async def _fanout_get(client, path: str, count: int, concurrency: int = 20):
+    """Issue `count` in-process GETs with bounded concurrency."""
+    sem = asyncio.Semaphore(concurrency)
+    get = client.get  # bound once; skips the method lookup per call
+
+    async def one():
+        async with sem:
+            return await get(path)
+
+    return await asyncio.gather(*[one() for _ in range(count)])
+
+
 class TestRateLimiting:
     """Test suite for rate limiting."""
     
-    def test_rate_limit_headers_present(self, client):
+    def test_rate_limit_headers_present(self, client, monkeypatch):
         """Test that rate limit headers are present in responses."""
-        # Enable rate limiting for this test
-        os.environ["RATE_LIMIT_ENABLED"] = "true"
-        
-        from app.main import app
-        from fastapi.testclient import TestClient
-        
-        with TestClient(app) as test_client:
-            response = test_client.get("/health")
-            
-            # Health endpoint is exempt, so no rate limit headers
-            # Test with a non-exempt endpoint would be better but requires mocking
-            assert response.status_code == status.HTTP_200_OK
-        
-        os.environ["RATE_LIMIT_ENABLED"] = "false"
-    
-    def test_exempt_endpoints_not_rate_limited(self, client):
+        # Enable rate limiting; monkeypatch reverts it even on failure
+        monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+
+        response = client.get("/health")
+
+        # Health endpoint is exempt, so no rate limit headers
+        # Test with a non-exempt endpoint would be better but requires mocking
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_exempt_endpoints_not_rate_limited(self, async_client, monkeypatch):
         """Test that exempt endpoints are not rate limited."""
-        os.environ["RATE_LIMIT_ENABLED"] = "true"
-        
-        from app.main import app
-        from fastapi.testclient import TestClient
-        
-        with TestClient(app) as test_client:
-            # Make many requests to exempt endpoint
-            for _ in range(100):
-                response = test_client.get("/health")
-                assert response.status_code == status.HTTP_200_OK
-        
-        os.environ["RATE_LIMIT_ENABLED"] = "false"
-    
-    def test_rate_limit_disabled(self, client):
+        monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+
+        # Many concurrent requests to an exempt endpoint via the shared
+        # in-process client instead of 100 serial round trips
+        responses = await _fanout_get(async_client, "/health", 100)
+        ok = status.HTTP_200_OK  # local alias for the 100-iteration check
+        assert all(r.status_code == ok for r in responses)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_rate_limit_disabled(self, async_client):
         """Test that rate limiting can be disabled."""
         # Rate limiting is disabled in conftest.py
         # Make many requests and ensure none are rate limited
-        for _ in range(100):
-            response = client.get("/health")
-            assert response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+        responses = await _fanout_get(async_client, "/health", 100)
+        too_many = status.HTTP_429_TOO_MANY_REQUESTS
+        assert all(r.status_code != too_many for r in responses)
+
+
+class TestRedisRateLimiter:
+    """Test suite for the Redis-backed sliding window."""
+
+    async def test_redis_sliding_window(self):
+        """Test that the Redis limiter enforces the window and headers."""
+        fakeredis = pytest.importorskip("fakeredis")
+        from app.middleware.rate_limit import RedisRateLimiter
+
+        limiter = RedisRateLimiter(
+            requests_per_minute=3,
+            client=fakeredis.aioredis.FakeRedis(),
+        )
+
+        results = [await limiter.is_allowed("ip:1.2.3.4") for _ in range(4)]
+
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert results[-1][1]["X-RateLimit-Remaining"] == "0"
+        assert "Retry-After" in results[-1][1]
+
+        # Other identifiers keep their own window
+        allowed, _ = await limiter.is_allowed("ip:5.6.7.8")
+        assert allowed
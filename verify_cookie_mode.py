@@ -1,69 +1,89 @@
 """
 Quick verification script for WebAI-to-API cookie mode
 """
-import requests
-import json
+import asyncio
+import sys
 
-print("\n" + "="*70)
-print("  WebAI-to-API Cookie Mode Verification")
-print("="*70)
+import httpx
+
+try:
+    import orjson
+
+    def _loads(raw):
+        return orjson.loads(raw)
+except ImportError:
+    import json
+
+    def _loads(raw):
+        return json.loads(raw)
 
 base_url = "http://localhost:6969"
 
-# Test 1: Health check
-print("\n[1/3] Testing health endpoint...")
-try:
-    response = requests.get(f"{base_url}/health", timeout=5)
+CHAT_PAYLOAD = {
+    "model": "gemini-3.0-pro",
+    "messages": [
+        {"role": "user", "content": "Say 'Cookie mode working!' if you can read this"}
+    ],
+    "max_tokens": 50
+}
+
+
+def _outcome(task):
+    """(response, error) for a probe task after asyncio.wait settled."""
+    if task.cancelled() or not task.done():
+        return None, "cancelled after an earlier probe failed"
+    error = task.exception()
+    if error is not None:
+        return None, error
+    return task.result(), None
+
+
+def report_health(response, error):
+    print("\n[1/3] Testing health endpoint...")
+    if error is not None:
+        print(f"  ❌ Server not reachable: {error}")
+        print("\n  Make sure WebAI-to-API is running: python src\\run.py")
+        return False
     if response.status_code == 200:
         print("  ✅ Server is running")
     else:
         print(f"  ❌ Server returned {response.status_code}")
-except Exception as e:
-    print(f"  ❌ Server not reachable: {e}")
-    print("\n  Make sure WebAI-to-API is running: python src\\run.py")
-    exit(1)
+    return True
 
-# Test 2: Models endpoint
-print("\n[2/3] Testing models endpoint...")
-try:
-    response = requests.get(f"{base_url}/v1/models", timeout=5)
+
+def report_models(response, error):
+    print("\n[2/3] Testing models endpoint...")
+    if error is not None:
+        print(f"  ❌ Models endpoint failed: {error}")
+        return
     if response.status_code == 200:
         models = response.json()
         print(f"  ✅ Models endpoint working")
         if 'data' in models:
             print(f"  📋 Available models: {len(models['data'])}")
-            for model in models['data'][:3]:
-                print(f"     - {model.get('id', 'unknown')}")
+            listed = models['data'][:3]
+            if listed:
+                # One write for the whole batch instead of one per model
+                sys.stdout.write(
+                    "\n".join(f"     - {m.get('id', 'unknown')}" for m in listed) + "\n"
+                )
     else:
         print(f"  ⚠️  Models endpoint returned {response.status_code}")
-except Exception as e:
-    print(f"  ❌ Models endpoint failed: {e}")
 
-# Test 3: Chat completion (actual Gemini test)
-print("\n[3/3] Testing chat completion with Gemini...")
-try:
-    payload = {
-        "model": "gemini-3.0-pro",
-        "messages": [
-            {"role": "user", "content": "Say 'Cookie mode working!' if you can read this"}
-        ],
-        "max_tokens": 50
-    }
-    
-    response = requests.post(
-        f"{base_url}/v1/chat/completions",
-        json=payload,
-        headers={"Content-Type": "application/json"},
-        timeout=30
-    )
-    
+
+def report_chat(response, error):
+    print("\n[3/3] Testing chat completion with Gemini...")
+    if error is not None:
+        print(f"  ❌ Chat completion error: {error}")
+        return
+
     if response.status_code == 200:
-        data = response.json()
+        data = _loads(response.content)
         if 'choices' in data and len(data['choices']) > 0:
             message = data['choices'][0]['message']['content']
             print(f"  ✅ Chat completion successful!")
             print(f"  💬 Gemini response: {message[:100]}")
-            
+
             # Check usage
             if 'usage' in data:
                 print(f"  📊 Tokens used: {data['usage']}")
@@ -72,18 +92,64 @@ try:
     else:
         print(f"  ❌ Chat completion failed with status {response.status_code}")
         print(f"  Response: {response.text[:200]}")
-        
-except Exception as e:
-    print(f"  ❌ Chat completion error: {e}")
-
-print("\n" + "="*70)
-print("  Verification Complete")
-print("="*70)
-
-print("\n💡 Next steps:")
-print("  1. If all tests passed ✅ → Cookie mode is working!")
-print("  2. Configure app4/.env with:")
-print("     USE_LOCAL_GEMINI=true")
-print("     WEBAI_API_BASE_URL=http://localhost:6969/v1")
-print("  3. Test app4: cd app4 && python test_simple.py")
-print()
+
+
+async def main():
+    print("\n" + "="*70)
+    print("  WebAI-to-API Cookie Mode Verification")
+    print("="*70)
+
+    # One pooled client for all probes: the TCP connection set up by the
+    # first request is reused by the rest. Tight connect timeout so a
+    # down server fails in ~2s instead of waiting out the read timeout.
+    timeout = httpx.Timeout(5.0, connect=2.0, read=30.0)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        health_task = asyncio.create_task(client.get("/health"))
+        models_task = asyncio.create_task(client.get("/v1/models"))
+        chat_task = asyncio.create_task(client.post(
+            "/v1/chat/completions",
+            json=CHAT_PAYLOAD,
+            headers={"Content-Type": "application/json"},
+        ))
+
+        # All probes fly together; the first failure cancels whatever is
+        # still in flight so a dead server doesn't hold sockets open
+        done, pending = await asyncio.wait(
+            {health_task, models_task, chat_task},
+            return_when=asyncio.FIRST_EXCEPTION,
+        )
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        server_up = report_health(*_outcome(health_task))
+        if not server_up:
+            # Retrieve the other probes' errors so asyncio doesn't log
+            # them as never-retrieved on exit
+            _outcome(models_task)
+            _outcome(chat_task)
+            raise SystemExit(1)
+
+        report_models(*_outcome(models_task))
+        report_chat(*_outcome(chat_task))
+
+    print("\n" + "="*70)
+    print("  Verification Complete")
+    print("="*70)
+
+    # The whole block goes out in a single write
+    print("\n".join((
+        "",
+        "💡 Next steps:",
+        "  1. If all tests passed ✅ → Cookie mode is working!",
+        "  2. Configure app4/.env with:",
+        "     USE_LOCAL_GEMINI=true",
+        "     WEBAI_API_BASE_URL=http://localhost:6969/v1",
+        "  3. Test app4: cd app4 && python test_simple.py",
+        "",
+    )))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())